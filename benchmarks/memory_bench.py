@@ -0,0 +1,115 @@
+"""
+Memory held per shape and per vertex, measured with tracemalloc.
+
+    python -m benchmarks.memory_bench --shapes 10000
+
+Each kind of shape is built fresh, then added to a scene and drawn once so
+its render buffers exist. Only Python and NumPy allocations are traced;
+memory held natively by skia paths is not included.
+"""
+from __future__ import annotations
+import argparse
+import gc
+import random
+import tracemalloc
+from typing import Callable
+import numpy as np
+from shared_crypto_analysis.shared_python.shared_math.geometry import Vec2
+from main.headless import HeadlessRenderer
+from main.helpers import Color
+from main.session.session import Session
+from main.session.scene.shapes.shapes import Shape
+
+
+class MemoryResult:
+    def __init__(self, name: str, shapes: int, vertices: int, built_bytes: int, drawn_bytes: int) -> None:
+        self.name = name
+        self.shapes = shapes
+        self.vertices = vertices
+        self.built_bytes = built_bytes
+        self.drawn_bytes = drawn_bytes
+
+    def __str__(self) -> str:
+        return f'{self.name:<20}{self.shapes:>8}{self.vertices:>10}' \
+            f'{self.built_bytes / self.shapes:>12.0f}{self.built_bytes / self.vertices:>12.1f}' \
+            f'{self.drawn_bytes / self.shapes:>12.0f}{self.drawn_bytes / self.vertices:>12.1f}'
+
+
+def _traced(build: Callable[[], object]) -> tuple[object, int]:
+    """
+    Runs build and returns its result with the bytes still allocated
+    """
+    gc.collect()
+    tracemalloc.start()
+    ret = build()
+    gc.collect()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return ret, allocated
+
+
+def _measure(name: str, num_shapes: int, vertices_per_shape: int,
+             make: Callable[[random.Random], Shape], seed: int) -> MemoryResult:
+    rng = random.Random(seed)
+    shapes, built = _traced(lambda: [make(rng) for _ in range(num_shapes)])
+
+    # One frame at a scale that shows every shape, so every path is built
+    session = Session()
+    session.scene.transform.width = 1000
+    session.scene.transform.height = 1000
+    session.scene.transform.scale_factor = 0.3
+    session.scene.tiles.frame_budget = None
+    renderer = HeadlessRenderer(1000, 1000)
+
+    def draw() -> None:
+        for shape in shapes:
+            session.add_shape(shape)
+        renderer.render(session)
+
+    _, drawn = _traced(draw)
+    vertices = num_shapes * vertices_per_shape
+
+    return MemoryResult(name, num_shapes, vertices, built, built + drawn)
+
+
+def run(num_shapes: int, polyline_points: int, seed: int) -> list[MemoryResult]:
+    color = Color(50, 50, 50)
+
+    def position(rng: random.Random) -> Vec2:
+        return Vec2(rng.uniform(-1500, 1500), rng.uniform(-1500, 1500))
+
+    def polyline(rng: random.Random) -> Shape:
+        start = position(rng)
+        xs = start.x + np.arange(polyline_points, dtype=np.float64)
+        ys = start.y + np.cumsum(np.fromiter(
+            (rng.uniform(-1, 1) for _ in range(polyline_points)), np.float64))
+        return Shape.construct_polyline(xs, ys, color)
+
+    return [
+        _measure('circle', num_shapes, 4,
+                 lambda rng: Shape.construct_circle(position(rng), 10, color), seed),
+        _measure('hexagon', num_shapes, 6,
+                 lambda rng: Shape.construct_polygon(position(rng), 10, 6, color), seed),
+        _measure(f'polyline x{polyline_points}', max(1, num_shapes // 100),
+                 polyline_points, polyline, seed),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--shapes', type=int, default=10000)
+    parser.add_argument('--polyline-points', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    results = run(args.shapes, args.polyline_points, args.seed)
+
+    print(f'{"shape":<20}{"shapes":>8}{"vertices":>10}{"B/shape":>12}{"B/vertex":>12}'
+          f'{"drawn B/sh":>12}{"drawn B/vx":>12}')
+    for result in results:
+        print(result)
+
+
+if __name__ == '__main__':
+    main()
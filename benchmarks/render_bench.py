@@ -0,0 +1,235 @@
+"""
+Frame time benchmarks, rendered headless into a CPU raster surface.
+
+    python -m benchmarks.render_bench --shapes 2000 --frames 30
+
+Every stage runs once untraced for timings and once under tracemalloc for
+allocations, with a fixed seed so runs are comparable.
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+import tracemalloc
+from typing import Callable
+import numpy as np
+from shared_crypto_analysis.shared_python.shared_math.geometry import Vec2, BezierPathA, BezierPath, BezierContour, BezierPoint
+from main.headless import HeadlessRenderer
+from main.helpers import MOUSE_ACTION, Color
+from main.session.session import Session
+from main.session.scene.shapes.shapes import Shape
+
+
+class StageResult:
+    def __init__(self, name: str, calls: int, seconds: float, peak_bytes: int, allocated_bytes: int) -> None:
+        self.name = name
+        self.calls = calls
+        self.seconds = seconds
+        self.peak_bytes = peak_bytes
+        self.allocated_bytes = allocated_bytes
+
+    def __str__(self) -> str:
+        per_call = self.seconds / self.calls * 1000.0
+        return f'{self.name:<28}{self.calls:>7}{self.seconds * 1000.0:>12.2f}' \
+            f'{per_call:>12.3f}{self.peak_bytes / 1024:>12.1f}{self.allocated_bytes / 1024:>12.1f}'
+
+
+def _measure(name: str, setup: Callable[[], object], stage: Callable[[object], int]) -> StageResult:
+    """
+    Runs stage on a fresh setup() twice: once timed, once traced. stage
+    returns the number of calls it made.
+    """
+    state = setup()
+    start = time.perf_counter()
+    calls = stage(state)
+    seconds = time.perf_counter() - start
+
+    state = setup()
+    tracemalloc.start()
+    stage(state)
+    allocated, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return StageResult(name, calls, seconds, peak, allocated)
+
+
+def _session(width: int, height: int) -> Session:
+    session = Session()
+    session.scene.transform.width = width
+    session.scene.transform.height = height
+    # Render tiles inline so every frame measured is complete
+    session.scene.tiles.frame_budget = None
+    return session
+
+
+def _shapes(num_shapes: int, spread: float, seed: int) -> list[Shape]:
+    rng = random.Random(seed)
+    color = Color(50, 50, 50)
+
+    ret = []
+    for i in range(num_shapes):
+        pos = Vec2(rng.uniform(-spread, spread), rng.uniform(-spread, spread))
+        if i % 2:
+            ret.append(Shape.construct_circle(pos, rng.uniform(5, 40), color))
+        else:
+            ret.append(Shape.construct_polygon(
+                pos, rng.uniform(5, 40), rng.randint(3, 12), color))
+
+    return ret
+
+
+def _bezier_polyline(xs: np.ndarray, ys: np.ndarray, color: Color) -> Shape:
+    contour = BezierContour()
+    for x, y in zip(xs.tolist(), ys.tolist()):
+        contour.add_point(BezierPoint(Vec2(x, y)))
+
+    path = BezierPath()
+    path.add_contour(contour)
+    patha = BezierPathA()
+    patha.paths.append(path)
+
+    ret = Shape()
+    ret.color = color
+    ret.path = patha
+    return ret
+
+
+def run(width: int, height: int, num_shapes: int, frames: int, drag_steps: int,
+        polyline_points: int, seed: int) -> list[StageResult]:
+    spread = max(width, height) * 2
+    results = []
+
+    # Converting a long polyline's model into a skia path, for both the
+    # bezier point model and the array backed one
+    rng = np.random.default_rng(seed)
+    xs = np.arange(polyline_points, dtype=np.float64)
+    ys = np.cumsum(rng.uniform(-1.0, 1.0, polyline_points))
+    color = Color(50, 50, 50)
+
+    def build_path(shape: Shape) -> int:
+        shape.context_path.path
+        return 1
+
+    results.append(_measure(
+        f'path build bezier x{polyline_points}',
+        lambda: _bezier_polyline(xs, ys, color), build_path))
+    results.append(_measure(
+        f'path build array x{polyline_points}',
+        lambda: Shape.construct_polyline(xs, ys, color), build_path))
+
+    def construct(_) -> int:
+        _shapes(num_shapes, spread, seed)
+        return num_shapes
+
+    results.append(_measure('construct shapes', lambda: None, construct))
+
+    def populated() -> tuple[Session, HeadlessRenderer]:
+        session = _session(width, height)
+        for shape in _shapes(num_shapes, spread, seed):
+            session.add_shape(shape)
+        return session, HeadlessRenderer(width, height)
+
+    def add_shapes(state) -> int:
+        session = _session(width, height)
+        for shape in state:
+            session.add_shape(shape)
+        return len(state)
+
+    results.append(_measure(
+        'add shapes', lambda: _shapes(num_shapes, spread, seed), add_shapes))
+
+    def first_frame(state) -> int:
+        session, renderer = state
+        renderer.render(session)
+        return 1
+
+    results.append(_measure('first frame', populated, first_frame))
+
+    def steady_frames(state) -> int:
+        session, renderer = state
+        renderer.render(session)
+        for _ in range(frames):
+            renderer.render(session)
+        return frames
+
+    results.append(_measure('steady frames', populated, steady_frames))
+
+    def pan_frames(state) -> int:
+        session, renderer = state
+        for i in range(frames):
+            session.scene.transform.apply_pan(Vec2(7.0, 3.0))
+            renderer.render(session)
+        return frames
+
+    results.append(_measure('pan frames', populated, pan_frames))
+
+    for scale_factor in (0.3, 1.0, 4.0):
+        def grid_frames(state, scale_factor=scale_factor) -> int:
+            session, renderer = state
+            session.scene.transform.scale_factor = scale_factor
+            for _ in range(frames):
+                renderer.render(session.scene.grid)
+            return frames
+
+        results.append(_measure(
+            f'grid frames x{scale_factor}',
+            lambda: (_session(width, height), HeadlessRenderer(width, height)),
+            grid_frames))
+
+    def drag_shape(state) -> int:
+        session, _ = state
+        # Grab a shape through the screen position of its centre
+        shape = session.scene._shapes[0]
+        left, top, right, bottom = shape.bounds()
+        screen = session.scene.transform.world_to_screen(
+            [((left + right) / 2, (top + bottom) / 2)])[0]
+        pos = Vec2(float(screen[0]), float(screen[1]))
+
+        session.mouse_action(MOUSE_ACTION.LEFT_CLICK_DOWN, pos)
+        for i in range(drag_steps):
+            session.mouse_action(MOUSE_ACTION.LEFT_CLICK_DRAG,
+                                 pos + Vec2(float(i), float(i)))
+        session.mouse_action(MOUSE_ACTION.LEFT_CLICK_UP,
+                             pos + Vec2(float(drag_steps), float(drag_steps)))
+        return drag_steps + 2
+
+    results.append(_measure('drag shape events', populated, drag_shape))
+
+    def drag_pan(state) -> int:
+        session, _ = state
+        pos = Vec2(-1e6, -1e6)
+
+        session.mouse_action(MOUSE_ACTION.LEFT_CLICK_DOWN, pos)
+        for i in range(drag_steps):
+            session.mouse_action(MOUSE_ACTION.LEFT_CLICK_DRAG,
+                                 pos + Vec2(float(i), 0.0))
+        session.mouse_action(MOUSE_ACTION.LEFT_CLICK_UP, pos)
+        return drag_steps + 2
+
+    results.append(_measure('drag pan events', populated, drag_pan))
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--width', type=int, default=1200)
+    parser.add_argument('--height', type=int, default=1000)
+    parser.add_argument('--shapes', type=int, default=2000)
+    parser.add_argument('--frames', type=int, default=30)
+    parser.add_argument('--drag-steps', type=int, default=200)
+    parser.add_argument('--polyline-points', type=int, default=200000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    results = run(args.width, args.height, args.shapes, args.frames,
+                  args.drag_steps, args.polyline_points, args.seed)
+
+    print(f'{"stage":<28}{"calls":>7}{"total ms":>12}{"ms/call":>12}'
+          f'{"peak KiB":>12}{"live KiB":>12}')
+    for result in results:
+        print(result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+import numpy as np
+from shared_crypto_analysis.shared_python.shared_math.geometry import Vec2, BezierContour
+
+# ArrayContour.flags bits
+HAS_CONTROL1 = 1
+HAS_CONTROL2 = 2
+
+
+class ArrayContour:
+    """
+    A contour stored as contiguous NumPy buffers rather than one BezierPoint
+    per vertex, for long series such as price polylines.
+
+    positions, control1 and control2 are (N, 2) arrays; the controls may be
+    None when no point has one, which is the common case for polylines.
+    flags holds HAS_CONTROL1 / HAS_CONTROL2 per point.
+    """
+
+    def __init__(self, positions: np.ndarray, control1: np.ndarray = None, control2: np.ndarray = None,
+                 flags: np.ndarray = None, closed: bool = False, dtype=np.float64) -> None:
+        self.positions = np.ascontiguousarray(positions, dtype=dtype)
+        self.control1 = None if control1 is None else \
+            np.ascontiguousarray(control1, dtype=dtype)
+        self.control2 = None if control2 is None else \
+            np.ascontiguousarray(control2, dtype=dtype)
+
+        if flags is None:
+            flags = np.zeros(len(self.positions), dtype=np.uint8)
+            if self.control1 is not None:
+                flags |= HAS_CONTROL1
+            if self.control2 is not None:
+                flags |= HAS_CONTROL2
+        self.flags = np.ascontiguousarray(flags, dtype=np.uint8)
+
+        self.closed = closed
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    @classmethod
+    def from_polyline(cls, xs: np.ndarray, ys: np.ndarray, closed: bool = False, dtype=np.float64) -> ArrayContour:
+        positions = np.empty((len(xs), 2), dtype=dtype)
+        positions[:, 0] = xs
+        positions[:, 1] = ys
+        return cls(positions, closed=closed, dtype=dtype)
+
+    @classmethod
+    def from_contour(cls, contour: BezierContour, dtype=np.float64) -> ArrayContour:
+        points = contour.points
+        num_points = len(points)
+
+        positions = np.empty((num_points, 2), dtype=dtype)
+        control1 = np.zeros((num_points, 2), dtype=dtype)
+        control2 = np.zeros((num_points, 2), dtype=dtype)
+        flags = np.zeros(num_points, dtype=np.uint8)
+
+        for i, p in enumerate(points):
+            positions[i] = (p.pos.x, p.pos.y)
+            if p.control1:
+                control1[i] = (p.control1.x, p.control1.y)
+                flags[i] |= HAS_CONTROL1
+            if p.control2:
+                control2[i] = (p.control2.x, p.control2.y)
+                flags[i] |= HAS_CONTROL2
+
+        return cls(positions,
+                   control1 if (flags & HAS_CONTROL1).any() else None,
+                   control2 if (flags & HAS_CONTROL2).any() else None,
+                   flags, contour.closed, dtype)
+
+    def arrays(self) -> tuple:
+        """
+        (positions, control1, control2, has_control1, has_control2, closed);
+        a missing control array is substituted with positions, which is
+        never read as its flag is clear for every point
+        """
+        return (self.positions,
+                self.positions if self.control1 is None else self.control1,
+                self.positions if self.control2 is None else self.control2,
+                (self.flags & HAS_CONTROL1).astype(bool),
+                (self.flags & HAS_CONTROL2).astype(bool),
+                self.closed)
+
+    def bounds(self) -> tuple[float, float, float, float] | None:
+        if not len(self.positions):
+            return None
+
+        stacked = [self.positions]
+        if self.control1 is not None:
+            stacked.append(self.control1[(self.flags & HAS_CONTROL1) != 0])
+        if self.control2 is not None:
+            stacked.append(self.control2[(self.flags & HAS_CONTROL2) != 0])
+        stacked = np.concatenate(stacked)
+
+        left, top = stacked.min(axis=0)
+        right, bottom = stacked.max(axis=0)
+        return (float(left), float(top), float(right), float(bottom))
+
+    def translate(self, pos: Vec2) -> None:
+        offset = np.array((pos.x, pos.y), dtype=self.positions.dtype)
+
+        self.positions += offset
+        if self.control1 is not None:
+            self.control1 += offset
+        if self.control2 is not None:
+            self.control2 += offset
+
+
+class ArrayPath:
+    """
+    Counterpart of BezierPath holding ArrayContours, so it can sit in a
+    BezierPathA alongside regular paths
+    """
+
+    def __init__(self) -> None:
+        self.contours: list[ArrayContour] = []
+
+    def add_contour(self, contour: ArrayContour) -> None:
+        self.contours.append(contour)
+
+    def translate(self, pos: Vec2) -> None:
+        for contour in self.contours:
+            contour.translate(pos)
@@ -1,11 +1,225 @@
+from __future__ import annotations
+import itertools
 from abc import ABC, abstractmethod
 from functools import cached_property
 from shared_crypto_analysis.shared_python.shared_math.geometry import Rect, Vec2, BezierPathA
-from typing import overload
+from collections import OrderedDict
+from typing import Callable, overload
+from .array_geometry import ArrayContour
+from .profiling import profiler
 from numpy import ndarray
 from skia import *
+import numpy as np
 import skia
 
+# skia.Path.Make verbs
+_VERB_MOVE = 0
+_VERB_LINE = 1
+_VERB_CUBIC = 4
+_VERB_CLOSE = 5
+
+
+def _contour_arrays(contour) -> tuple:
+    """
+    Gathers a BezierContour into (positions, control1, control2,
+    has_control1, has_control2, closed), positions and controls as (N, 2)
+    arrays with zeros where a control is missing
+    """
+    if isinstance(contour, ArrayContour):
+        return contour.arrays()
+
+    points = contour.points
+    num_points = len(points)
+
+    positions = np.fromiter(
+        itertools.chain.from_iterable((p.pos.x, p.pos.y) for p in points),
+        dtype=np.float32, count=num_points * 2).reshape(-1, 2)
+
+    # Controls are usually sparse, so only the points having one are read
+    def controls(vectors: list) -> tuple[ndarray, ndarray]:
+        has_control = np.fromiter(map(bool, vectors), dtype=bool,
+                                  count=num_points)
+        ret = np.zeros((num_points, 2), dtype=np.float32)
+        indices = np.flatnonzero(has_control)
+        if len(indices):
+            ret[indices] = [(vectors[i].x, vectors[i].y)
+                            for i in indices.tolist()]
+        return ret, has_control
+
+    control1, has_control1 = controls([p.control1 for p in points])
+    control2, has_control2 = controls([p.control2 for p in points])
+
+    return positions, control1, control2, has_control1, has_control2, contour.closed
+
+
+def _contour_buffers(positions: ndarray, control1: ndarray, control2: ndarray,
+                     has_control1: ndarray, has_control2: ndarray, closed: bool) -> tuple[ndarray, ndarray]:
+    """
+    Converts contour arrays to the (points, verbs) buffers Path.Make takes.
+    A segment is a cubic when its start has a control2 and its end a
+    control1, otherwise a line. Only closed contours get the segment back
+    to the first point.
+    """
+    num_points = len(positions)
+    if num_points == 0:
+        return np.empty((0, 2), dtype=np.float32), np.empty(0, dtype=np.uint8)
+
+    num_segments = num_points if closed else num_points - 1
+    current = np.arange(num_segments)
+    following = (current + 1) % num_points
+    cubic = has_control2[current] & has_control1[following]
+
+    # Every segment adds its end point, cubics add both controls before it
+    segment_size = np.where(cubic, 3, 1)
+    ends = np.cumsum(segment_size)
+
+    points = np.empty((1 + ends[-1] if num_segments else 1, 2),
+                      dtype=np.float32)
+    points[0] = positions[0]
+    points[ends] = positions[following]
+    points[ends[cubic] - 2] = control2[current[cubic]]
+    points[ends[cubic] - 1] = control1[following[cubic]]
+
+    verbs = np.empty(1 + num_segments + int(closed), dtype=np.uint8)
+    verbs[0] = _VERB_MOVE
+    verbs[1:1 + num_segments] = np.where(cubic, _VERB_CUBIC, _VERB_LINE)
+    if closed:
+        verbs[-1] = _VERB_CLOSE
+
+    return points, verbs
+
+
+def _fill_edges(points: ndarray, verbs: ndarray, cubic_steps: int) -> ndarray:
+    """
+    Flattens one contour's (points, verbs) buffers into an (E, 4) array of
+    (x0, y0, x1, y1) edges, cubics split into cubic_steps lines, closed back
+    to the first point as filling does
+    """
+    if len(verbs) < 2:
+        return np.empty((0, 4))
+
+    points = np.asarray(points, dtype=np.float64)
+    segment_verbs = verbs[1:]
+    segment_verbs = segment_verbs[segment_verbs != _VERB_CLOSE]
+
+    # Index of the end point of every segment
+    ends = np.cumsum(np.where(segment_verbs == _VERB_CUBIC, 3, 1))
+    starts = np.concatenate(([0], ends[:-1]))
+
+    lines = segment_verbs == _VERB_LINE
+    line_edges = np.concatenate(
+        [points[starts[lines]], points[ends[lines]]], axis=1)
+
+    cubics = segment_verbs == _VERB_CUBIC
+    p0 = points[starts[cubics]]
+    c1 = points[starts[cubics] + 1]
+    c2 = points[starts[cubics] + 2]
+    p3 = points[ends[cubics]]
+
+    t = np.linspace(0.0, 1.0, cubic_steps + 1)[None, :, None]
+    u = 1.0 - t
+    curve = (u ** 3 * p0[:, None] + 3 * u ** 2 * t * c1[:, None] +
+             3 * u * t ** 2 * c2[:, None] + t ** 3 * p3[:, None])
+    cubic_edges = np.concatenate(
+        [curve[:, :-1], curve[:, 1:]], axis=2).reshape(-1, 4)
+
+    # Winding does not depend on edge order, so lines and cubics need not
+    # be interleaved back into path order
+    closing = np.concatenate([points[ends[-1]], points[0]])[None]
+    return np.concatenate([line_edges, cubic_edges, closing])
+
+
+def _winding(points: ndarray, edges: ndarray, chunk: int = 1 << 22) -> ndarray:
+    """
+    Non-zero winding number of an (N, 2) array of points against (E, 4)
+    edges, in chunks of about chunk point-edge pairs
+    """
+    ret = np.zeros(len(points), dtype=np.int64)
+    if not len(edges) or not len(points):
+        return ret
+
+    x0, y0, x1, y1 = (edges[:, i][None] for i in range(4))
+    step = max(1, chunk // len(edges))
+    for first in range(0, len(points), step):
+        px = points[first:first + step, 0][:, None]
+        py = points[first:first + step, 1][:, None]
+
+        cross = (x1 - x0) * (py - y0) - (px - x0) * (y1 - y0)
+        upward = (y0 <= py) & (y1 > py) & (cross > 0)
+        downward = (y0 > py) & (y1 <= py) & (cross < 0)
+        ret[first:first + step] = upward.sum(axis=1) - downward.sum(axis=1)
+
+    return ret
+
+
+def _skia_points(points: ndarray) -> list:
+    """
+    (N, 2) array as a list of skia.Point; pybind converts these far faster
+    than tuples
+    """
+    return list(itertools.starmap(skia.Point, points.tolist()))
+
+
+# Version of skia's path serialization _serialize_path writes
+_PATH_SERIAL_VERSION = 5
+
+
+def _serialize_path(points: ndarray, verbs: ndarray) -> bytes:
+    """
+    A winding filled path in skia's serialized form: a header of
+    (version | fill type << 8, point count, conic count, verb count), the
+    float32 points, then the verbs padded to 4 bytes
+    """
+    points = np.ascontiguousarray(points, dtype='<f4')
+    verbs = np.ascontiguousarray(verbs, dtype=np.uint8)
+
+    header = np.array([_PATH_SERIAL_VERSION | (int(skia.PathFillType.kWinding) << 8),
+                       len(points), 0, len(verbs)], dtype='<i4')
+    padding = bytes(-len(verbs) % 4)
+
+    return header.tobytes() + points.tobytes() + verbs.tobytes() + padding
+
+
+def _serialization_matches() -> bool:
+    """
+    Whether this skia serializes paths exactly as _serialize_path does.
+    The format is private to skia, so it is checked against a known path
+    rather than trusted.
+    """
+    points = np.array([[0, 0], [10, 0], [12, 4], [16, 4], [20, 0],
+                       [30, 30], [40, 35]], dtype=np.float32)
+    # move, line, cubic, close, move, line: 6 verbs, so padding is written
+    verbs = np.array([0, 1, 4, 5, 0, 1], dtype=np.uint8)
+
+    expected = skia.Path.Make(_skia_points(points), verbs.tolist(), [],
+                              skia.PathFillType.kWinding)
+    written = _serialize_path(points, verbs)
+    if bytes(expected.serialize()) != written:
+        return False
+
+    path = skia.Path()
+    return bool(path.readFromMemory(written)) and path == expected
+
+
+# Checked once at import; paths go through Path.Make when it fails
+_SERIALIZED_PATHS = _serialization_matches()
+
+
+def _make_skia_path(points: ndarray, verbs: ndarray) -> skia.Path:
+    """
+    Builds a winding filled path straight from the buffers. Where this
+    skia's serialization was found to match, the buffers are handed to it
+    serialized, else they go through Path.Make.
+    """
+    if _SERIALIZED_PATHS:
+        ret = skia.Path()
+        if ret.readFromMemory(_serialize_path(points, verbs)):
+            return ret
+
+    return skia.Path.Make(_skia_points(np.asarray(points, dtype=np.float32)),
+                          np.asarray(verbs, dtype=np.uint8).tolist(), [],
+                          skia.PathFillType.kWinding)
+
 
 class ContextPath(ABC):
     def __init__(self, path: BezierPathA, stroke=None, fill=None, stroke_thickness=1.0) -> None:
@@ -51,13 +265,37 @@ class ContextPath(ABC):
 
     def set_path(self, path: BezierPathA) -> None:
         self._path = path
-        if self.path:
-            del self.path
+        # Drop the cached backend path without building one for the new data
+        self.__dict__.pop('path', None)
+        self.__dict__.pop('fill_edges', None)
 
     @abstractmethod
     def translate(self, pos: Vec2) -> None:
         pass
 
+    @abstractmethod
+    def bounds(self) -> tuple[float, float, float, float] | None:
+        """
+        (left, top, right, bottom) of the path geometry including curve
+        control points, or None if empty
+        """
+        pass
+
+    @abstractmethod
+    def tight_bounds(self) -> tuple[float, float, float, float] | None:
+        """
+        As bounds, but fitted to the curves rather than their control points
+        """
+        pass
+
+    @abstractmethod
+    def contains_points(self, points: ndarray) -> ndarray:
+        """
+        Whether each of an (N, 2) array of points is inside any of the
+        filled paths
+        """
+        pass
+
     @abstractmethod
     @cached_property
     def path(self):
@@ -65,51 +303,150 @@ class ContextPath(ABC):
 
 
 class ContextPathSkia(ContextPath):
+    def __init__(self, path: BezierPathA, stroke=None, fill=None, stroke_thickness=1.0) -> None:
+        super().__init__(path, stroke, fill, stroke_thickness)
+
+        # (path index, contour index) -> (points, verbs) ready for Path.Make
+        self._contour_buffers = {}
+
+    def set_path(self, path: BezierPathA) -> None:
+        self._contour_buffers.clear()
+        super().set_path(path)
+
+    def invalidate_contour(self, path_index: int, contour_index: int) -> None:
+        """
+        Rebuild only the given contour on the next access of path; the
+        other contours reuse their converted buffers
+        """
+        self._contour_buffers.pop((path_index, contour_index), None)
+        self.__dict__.pop('path', None)
+        self.__dict__.pop('fill_edges', None)
+
+    def _buffers(self, path_index: int, contour_index: int, contour) -> tuple[np.ndarray, np.ndarray]:
+        key = (path_index, contour_index)
+
+        buffers = self._contour_buffers.get(key)
+        if buffers is None:
+            buffers = _contour_buffers(*_contour_arrays(contour))
+            self._contour_buffers[key] = buffers
+
+        return buffers
+
     @cached_property
     def path(self):
+        with profiler.span('ContextPathSkia.path'):
+            ret = []
+            for i, bezier_path in enumerate(self._path):
+                buffers = [self._buffers(i, j, contour)
+                           for j, contour in enumerate(bezier_path.contours)]
+
+                if buffers:
+                    points = np.concatenate([b[0] for b in buffers])
+                    verbs = np.concatenate([b[1] for b in buffers])
+                    ret.append(_make_skia_path(points, verbs))
+                else:
+                    ret.append(skia.Path())
+
+            return ret
+
+    def translate(self, pos: Vec2) -> None:
+        # Only offset what has already been built; anything built later is
+        # converted from the already translated model
+        for points, _ in self._contour_buffers.values():
+            points += (pos.x, pos.y)
+
+        if 'path' in self.__dict__:
+            for this_path in self.path:
+                this_path.offset(pos.x, pos.y)
+
+        if 'fill_edges' in self.__dict__:
+            for edges in self.fill_edges:
+                edges += (pos.x, pos.y, pos.x, pos.y)
+
+    # Lines per cubic when flattening for contains_points
+    CUBIC_STEPS = 16
+
+    @cached_property
+    def fill_edges(self) -> list[ndarray]:
+        """
+        Flattened (E, 4) edges of each skia path, for contains_points
+        """
         ret = []
-        for bezier_path in self._path:
-            skia_path = skia.Path()
+        for i, bezier_path in enumerate(self._path):
+            edges = [_fill_edges(*self._buffers(i, j, contour), self.CUBIC_STEPS)
+                     for j, contour in enumerate(bezier_path.contours)]
+            ret.append(np.concatenate(edges) if edges else np.empty((0, 4)))
+
+        return ret
+
+    def contains_points(self, points: ndarray) -> ndarray:
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
 
-            for contour in bezier_path.contours:
-                num_points = len(contour.points)
+        ret = np.zeros(len(points), dtype=bool)
+        for edges in self.fill_edges:
+            remaining = ~ret
+            ret[remaining] = _winding(points[remaining], edges) != 0
 
-                for i in range(num_points):
-                    current_point = contour.points[i].pos
-                    next_point = contour.points[(i + 1) % num_points].pos
-                    next_control1 = contour.points[(
-                        i + 1) % num_points].control1
-                    prev_control2 = contour.points[i].control2
+        return ret
 
-                    if i == 0:
-                        skia_path.moveTo(current_point.x, current_point.y)
+    def bounds(self) -> tuple[float, float, float, float] | None:
+        return self._union_bounds(skia.Path.getBounds)
 
-                    if next_control1 and prev_control2:
-                        skia_path.cubicTo(
-                            prev_control2.x, prev_control2.y,
-                            next_control1.x, next_control1.y,
-                            next_point.x, next_point.y
-                        )
-                    else:
-                        skia_path.lineTo(next_point.x, next_point.y)
+    def tight_bounds(self) -> tuple[float, float, float, float] | None:
+        return self._union_bounds(skia.Path.computeTightBounds)
 
-                if contour.closed:
-                    skia_path.close()
+    def _union_bounds(self, path_bounds: Callable[[skia.Path], skia.Rect]) -> tuple[float, float, float, float] | None:
+        ret = None
+        for sk_path in self.path:
+            if sk_path.isEmpty():
+                continue
 
-            ret.append(skia_path)
+            r = path_bounds(sk_path)
+            if ret is None:
+                ret = (r.left(), r.top(), r.right(), r.bottom())
+            else:
+                ret = (min(ret[0], r.left()), min(ret[1], r.top()),
+                       max(ret[2], r.right()), max(ret[3], r.bottom()))
 
         return ret
 
-    def translate(self, pos: Vec2) -> None:
-        if self.path:
-            for this_path in self.path:
-                this_path.offset(pos.x, pos.y)
+
+class ContextLinesSkia(ContextPathSkia):
+    """
+    Batches of straight line segments, stored as a list of (N, 4) arrays of
+    (x0, y0, x1, y1) rows. Each array becomes a single skia path, built in
+    one call rather than per segment.
+    """
+
+    @cached_property
+    def fill_edges(self) -> list[ndarray]:
+        # Bare segments enclose no area
+        return [np.empty((0, 4)) for _ in self._path]
+
+    @cached_property
+    def path(self):
+        with profiler.span('ContextLinesSkia.path'):
+            ret = []
+            for lines in self._path:
+                num_lines = len(lines)
+                points = np.asarray(lines, dtype=np.float32).reshape(
+                    num_lines * 2, 2)
+                verbs = np.tile(
+                    np.array([_VERB_MOVE, _VERB_LINE], dtype=np.uint8), num_lines)
+
+                ret.append(_make_skia_path(points, verbs))
+
+            return ret
 
 
 def path_provider() -> ContextPath:
     return ContextPathSkia
 
 
+def lines_provider() -> ContextPath:
+    return ContextLinesSkia
+
+
 class ContextWrapper(ABC):
     def get_context_path(self) -> ContextPath:
         return ContextPath
@@ -154,13 +491,86 @@ class ContextWrapper(ABC):
     def draw_path(self, path: BezierPathA) -> None:
         pass
 
+    @abstractmethod
+    def record(self, bounds: tuple[float, float, float, float], draw: Callable[[ContextWrapper], None]):
+        """
+        Records everything draw does to the context it is given into a
+        picture for draw_picture; bounds is (left, top, right, bottom) of
+        the content, in the coordinates draw uses
+        """
+        pass
+
+    @abstractmethod
+    def draw_picture(self, picture) -> None:
+        pass
+
+    @abstractmethod
+    def rasterize(self, width: int, height: int, draw: Callable[[ContextWrapper], None]):
+        """
+        Renders draw into a new transparent width x height image for
+        draw_image, on its own offscreen surface so the current one is left
+        as it was.
+        """
+        pass
+
+    @abstractmethod
+    def draw_image(self, image, src: tuple[float, float, float, float], dst: tuple[float, float, float, float]) -> None:
+        """
+        Draws the src (left, top, right, bottom) pixels of image scaled into
+        the dst rect
+        """
+        pass
+
+    # Batched drawing; colors is an optional (N,) array of packed ARGB
+    # values (see Color.argb), one per item, and the current color is used
+    # when it is None
+
+    @abstractmethod
+    def draw_rects(self, rects: ndarray, colors: ndarray = None) -> None:
+        """
+        Fills an (N, 4) array of (x, y, width, height) rects
+        """
+        pass
+
+    @abstractmethod
+    def draw_circles(self, centers: ndarray, radii, colors: ndarray = None) -> None:
+        """
+        Fills circles at an (N, 2) array of centers; radii is a scalar or an
+        (N,) array
+        """
+        pass
+
+    @abstractmethod
+    def draw_lines(self, lines: ndarray, colors: ndarray = None, thickness: float = 1.0) -> None:
+        """
+        Strokes an (N, 4) array of (x0, y0, x1, y1) segments
+        """
+        pass
+
 
 class ContextWrapperSkia(ContextWrapper):
+    # Pre-built paints kept for path drawing
+    PAINT_POOL_SIZE = 64
+
     def __init__(self, surface):
         self.surface = surface
         self.paint = skia.Paint()
         self.paint.setAntiAlias(True)
 
+        # Mirrors of self.paint's state so redundant sets can be skipped
+        self._color = self.paint.getColor()
+        self._style = self.paint.getStyle()
+
+        self._colors = {}
+        self._paints = OrderedDict()
+
+        # Used by the batched draws so they leave self.paint untouched
+        self._batch_paint = skia.Paint()
+        self._batch_paint.setAntiAlias(True)
+
+        # Tiles are drawn slightly scaled between zoom buckets
+        self._sampling = skia.SamplingOptions(skia.FilterMode.kLinear)
+
     def save(self) -> None:
         self.surface.save()
 
@@ -188,11 +598,52 @@ class ContextWrapperSkia(ContextWrapper):
     def get_context_path(self) -> ContextPathSkia:
         return ContextPathSkia
 
-    def set_color(self, color) -> None:
-        if not isinstance(color, int):
-            color = Color(color.r, color.g, color.b)
+    def _to_skia_color(self, color) -> int:
+        if isinstance(color, int):
+            return color
 
-        self.paint.setColor(color)
+        key = (color.r, color.g, color.b)
+        ret = self._colors.get(key)
+        if ret is None:
+            ret = Color(color.r, color.g, color.b)
+            self._colors[key] = ret
+
+        return ret
+
+    def _set_style(self, style) -> None:
+        if style != self._style:
+            self.paint.setStyle(style)
+            self._style = style
+
+    def _pooled_paint(self, color, style, stroke_width: float, antialias: bool) -> skia.Paint:
+        """
+        Shared paint for the given state, built on first use
+        """
+        color = self._to_skia_color(color)
+        key = (color, style, stroke_width, antialias)
+
+        paint = self._paints.get(key)
+        if paint is not None:
+            self._paints.move_to_end(key)
+            return paint
+
+        paint = skia.Paint()
+        paint.setColor(color)
+        paint.setStyle(style)
+        paint.setStrokeWidth(stroke_width)
+        paint.setAntiAlias(antialias)
+
+        self._paints[key] = paint
+        if len(self._paints) > self.PAINT_POOL_SIZE:
+            self._paints.popitem(last=False)
+
+        return paint
+
+    def set_color(self, color) -> None:
+        color = self._to_skia_color(color)
+        if color != self._color:
+            self.paint.setColor(color)
+            self._color = color
 
     def draw_circle(self, center: Vec2, radius: float) -> None:
         self.surface.drawCircle(
@@ -204,26 +655,135 @@ class ContextWrapperSkia(ContextWrapper):
 
     @overload
     def draw_rect(self, r: Rect) -> None:
-        self.paint.setStyle(self.paint.kFill_Style)
+        self._set_style(skia.Paint.kFill_Style)
         self.surface.drawRect(
             skia.Rect(r.minx, r.miny, r.width(), r.height()), self.paint)
 
     def draw_rect(self, x: float, y: float, width: float, height: float) -> None:
-        self.paint.setStyle(self.paint.kFill_Style)
+        self._set_style(skia.Paint.kFill_Style)
         rect = skia.Rect(x, y, x + width, y + height)
         self.surface.drawRect(rect, self.paint)
 
+    def record(self, bounds: tuple[float, float, float, float], draw: Callable[[ContextWrapper], None]) -> skia.Picture:
+        recorder = skia.PictureRecorder()
+        # The R-tree lets playback skip ops outside the clip
+        canvas = recorder.beginRecording(
+            skia.Rect.MakeLTRB(*bounds), skia.RTreeFactory()())
+
+        draw(ContextWrapperSkia(canvas))
+        return recorder.finishRecordingAsPicture()
+
+    def draw_picture(self, picture: skia.Picture) -> None:
+        self.surface.drawPicture(picture)
+
+    def rasterize(self, width: int, height: int, draw: Callable[[ContextWrapper], None]) -> skia.Image:
+        surface = skia.Surface(width, height)
+        canvas = surface.getCanvas()
+        canvas.clear(skia.ColorTRANSPARENT)
+
+        draw(ContextWrapperSkia(canvas))
+        return surface.makeImageSnapshot()
+
+    def draw_image(self, image: skia.Image, src: tuple[float, float, float, float], dst: tuple[float, float, float, float]) -> None:
+        self.surface.drawImageRect(
+            image, skia.Rect.MakeLTRB(*src), skia.Rect.MakeLTRB(*dst),
+            self._sampling)
+
+    def _color_groups(self, colors: ndarray, count: int):
+        """
+        Yields (color, indices) for each distinct color, so every group can
+        be drawn with a single paint
+        """
+        if colors is None:
+            yield self._color, np.arange(count)
+            return
+
+        unique, inverse = np.unique(colors, return_inverse=True)
+        order = np.argsort(inverse, kind='stable')
+        splits = np.cumsum(np.bincount(inverse, minlength=len(unique)))[:-1]
+
+        for color, indices in zip(unique.tolist(), np.split(order, splits)):
+            yield color, indices
+
+    def draw_rects(self, rects: ndarray, colors: ndarray = None) -> None:
+        num_rects = len(rects)
+        if num_rects == 0:
+            return
+
+        # Two triangles per rect, every color in a single vertices draw
+        rects = np.asarray(rects, dtype=np.float32)
+        left, top = rects[:, 0], rects[:, 1]
+        right, bottom = left + rects[:, 2], top + rects[:, 3]
+
+        xs = np.stack([left, right, right, left, right, left], axis=1)
+        ys = np.stack([top, top, bottom, top, bottom, bottom], axis=1)
+        positions = np.stack([xs.ravel(), ys.ravel()], axis=1)
+
+        if colors is None:
+            vertex_colors = [self._color] * len(positions)
+        else:
+            vertex_colors = np.repeat(
+                np.asarray(colors, dtype=np.uint32), 6).tolist()
+
+        vertices = skia.Vertices(
+            skia.Vertices.kTriangles_VertexMode,
+            _skia_points(positions), None, vertex_colors)
+        self.surface.drawVertices(vertices, self._batch_paint, BlendMode.kDst)
+
+    def draw_circles(self, centers: ndarray, radii, colors: ndarray = None) -> None:
+        num_circles = len(centers)
+        if num_circles == 0:
+            return
+
+        # Round points are drawn as circles of the stroke width, so each
+        # (color, radius) pair is a single drawPoints call
+        centers = np.asarray(centers, dtype=np.float32)
+        radii = np.broadcast_to(np.asarray(radii, dtype=np.float32),
+                                (num_circles,))
+        paint = self._batch_paint
+        paint.setStrokeCap(skia.Paint.kRound_Cap)
+
+        for color, by_color in self._color_groups(colors, num_circles):
+            paint.setColor(color)
+            group_radii = radii[by_color]
+            for radius in np.unique(group_radii).tolist():
+                indices = by_color[group_radii == radius]
+                paint.setStrokeWidth(radius * 2)
+                self.surface.drawPoints(
+                    skia.Canvas.kPoints_PointMode,
+                    _skia_points(centers[indices]), paint)
+
+    def draw_lines(self, lines: ndarray, colors: ndarray = None, thickness: float = 1.0) -> None:
+        num_lines = len(lines)
+        if num_lines == 0:
+            return
+
+        points = np.asarray(lines, dtype=np.float32).reshape(num_lines, 2, 2)
+        paint = self._batch_paint
+        paint.setStrokeCap(skia.Paint.kButt_Cap)
+        paint.setStrokeWidth(thickness)
+
+        for color, indices in self._color_groups(colors, num_lines):
+            paint.setColor(color)
+            self.surface.drawPoints(
+                skia.Canvas.kLines_PointMode,
+                _skia_points(points[indices].reshape(-1, 2)), paint)
+
     def draw_path(self, path: ContextPathSkia) -> None:
-        self.paint.setAntiAlias(path.antialias)
+        fill_paint = None
+        if path.fill_color:
+            fill_paint = self._pooled_paint(
+                path.fill_color, skia.Paint.kFill_Style, 0.0, path.antialias)
+
+        stroke_paint = None
+        if path.stroke_color:
+            stroke_paint = self._pooled_paint(
+                path.stroke_color, skia.Paint.kStroke_Style,
+                path.stroke_thickness, path.antialias)
 
         for sk_path in path.path:
-            if path.fill_color:
-                self.paint.setStyle(self.paint.kFill_Style)
-                self.set_color(path.fill_color)
-                self.surface.drawPath(sk_path, self.paint)
-
-            if path.stroke_color:
-                self.paint.setStyle(self.paint.kStroke_Style)
-                self.paint.setStrokeWidth(path.stroke_thickness)
-                self.set_color(path.stroke_color)
-                self.surface.drawPath(sk_path, self.paint)
+            if fill_paint is not None:
+                self.surface.drawPath(sk_path, fill_paint)
+
+            if stroke_paint is not None:
+                self.surface.drawPath(sk_path, stroke_paint)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable
+import pandas as pd
+from .metric_cache import Fetcher
+
+# (asset, metric, start, end)
+MetricRequest = tuple[str, str, int, int]
+
+
+class RateLimiter:
+    """
+    Per-host concurrency limit, plus a shared pause that every worker for
+    the host waits out once the server has asked us to back off.
+    """
+
+    def __init__(self, max_concurrent: int) -> None:
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+
+    def __enter__(self):
+        self._semaphore.acquire()
+        with self._lock:
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._semaphore.release()
+
+    def back_off(self, seconds: float) -> None:
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+
+def _retry_after(error: Exception) -> float | None:
+    """
+    Seconds the server asked us to wait, if error is a rate limit response
+    """
+    response = getattr(error, 'response', None)
+    if response is None or getattr(response, 'status_code', None) != 429:
+        return None
+
+    try:
+        return float(response.headers.get('Retry-After', 1.0))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def _time_index(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    frame indexed by a naive UTC DatetimeIndex named 't', whether it came
+    with a DatetimeIndex, a 't' column or an index of unix seconds
+    """
+    if isinstance(frame.index, pd.DatetimeIndex):
+        index = frame.index
+        if index.tz is not None:
+            index = index.tz_convert(None)
+    elif 't' in frame.columns:
+        index = pd.DatetimeIndex(pd.to_datetime(frame['t'], unit='s'))
+        frame = frame.drop(columns='t')
+    elif len(frame) == 0:
+        index = pd.DatetimeIndex([])
+    elif isinstance(frame.index, pd.RangeIndex) or \
+            not pd.api.types.is_integer_dtype(frame.index):
+        # A RangeIndex is row positions, joining on it would line rows up
+        # by position rather than by time
+        raise ValueError('frame has no time index or \'t\' column')
+    else:
+        index = pd.DatetimeIndex(pd.to_datetime(frame.index, unit='s'))
+
+    return frame.set_axis(index.rename('t'), axis=0)
+
+
+def _column_frame(frame: pd.DataFrame, asset: str, metric: str) -> pd.DataFrame:
+    frame = _time_index(frame)
+
+    if len(frame.columns) == 1:
+        return frame.set_axis([f'{asset}.{metric}'], axis=1)
+
+    return frame.add_prefix(f'{asset}.{metric}.')
+
+
+def fetch_many(requests: Iterable[MetricRequest], getters: dict[str, Fetcher],
+               max_workers: int = 16, per_host: int = 8, host_of: Callable[[str], str] = None,
+               retries: int = 3, backoff: float = 0.5) -> pd.DataFrame:
+    """
+    Runs many metric getters concurrently and joins their results into one
+    DataFrame aligned on time, one column per (asset, metric).
+
+    getters maps metric names to (asset, start, end) getters, for example
+    {'price': request.get_price}. host_of maps a metric to the host that
+    serves it so each host gets its own concurrency limit; by default every
+    metric shares one. Failed calls are retried with exponential backoff and
+    jitter, and a 429 response pauses every call to that host for its
+    Retry-After. Only the getter calls are retried.
+
+    Results are joined on a naive UTC DatetimeIndex named 't'; frames may
+    come indexed by time, with a 't' column of unix seconds or with an
+    index of unix seconds. Any other frame raises ValueError.
+    """
+    requests = list(requests)
+    limiters: dict[str, RateLimiter] = {}
+    limiters_lock = threading.Lock()
+
+    def limiter_for(metric: str) -> RateLimiter:
+        host = host_of(metric) if host_of else ''
+        with limiters_lock:
+            if host not in limiters:
+                limiters[host] = RateLimiter(per_host)
+            return limiters[host]
+
+    def run(request: MetricRequest) -> pd.DataFrame:
+        asset, metric, start, end = request
+        getter = getters[metric]
+        limiter = limiter_for(metric)
+
+        for attempt in range(retries + 1):
+            try:
+                with limiter:
+                    frame = getter(asset, start, end)
+            except Exception as error:
+                if attempt == retries:
+                    raise
+
+                retry_after = _retry_after(error)
+                if retry_after is not None:
+                    limiter.back_off(retry_after)
+                else:
+                    time.sleep(backoff * 2 ** attempt *
+                               (1.0 + random.random()))
+                continue
+
+            return _column_frame(frame, asset, metric)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        frames = list(pool.map(run, requests))
+
+    if not frames:
+        return pd.DataFrame()
+
+    return pd.concat(frames, axis=1, join='outer').sort_index()
@@ -0,0 +1,182 @@
+from __future__ import annotations
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from .metric_cache import MetricCache
+
+
+class _Table:
+    """
+    Memory maps of one (asset, metric, interval), valid for length rows
+    """
+
+    def __init__(self, length: int, times: np.ndarray, columns: dict[str, np.ndarray]) -> None:
+        self.length = length
+        self.times = times
+        self.columns = columns
+
+
+class ColumnarStore:
+    """
+    Append-only on disk store of time series, one directory per (asset,
+    metric, interval) holding a raw file per column plus the int64 unix
+    second time index.
+
+    Reads hand back read-only np.memmap views, so opening years of history
+    only maps the files and pages are loaded as they are touched. The row
+    count lives in meta.json and is only advanced after the column files
+    have been written, so a crashed append leaves the table as it was.
+
+        store = ColumnarStore('~/.local/share/crypto_visualizer')
+        store.append_frame('BTC', 'price', 86400, request.get_price('BTC', start, end))
+        times, columns = store.read('BTC', 'price', 86400, start, end)
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = os.path.expanduser(root)
+        os.makedirs(self.root, exist_ok=True)
+        self._tables: dict[tuple[str, str, int], _Table] = {}
+
+    def _dir(self, asset: str, metric: str, interval: int) -> str:
+        return os.path.join(self.root, asset, f'{metric}-{interval}')
+
+    def _meta(self, directory: str) -> dict:
+        path = os.path.join(directory, 'meta.json')
+        if not os.path.exists(path):
+            return None
+
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_meta(self, directory: str, meta: dict) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(directory, 'meta.json'))
+
+    @staticmethod
+    def _truncate(path: str, size: int) -> None:
+        if os.path.exists(path) and os.path.getsize(path) > size:
+            os.truncate(path, size)
+
+    @staticmethod
+    def _map(path: str, dtype: str, length: int) -> np.ndarray:
+        if length == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', shape=(length,))
+
+    def _table(self, asset: str, metric: str, interval: int) -> _Table:
+        directory = self._dir(asset, metric, interval)
+        meta = self._meta(directory)
+        if meta is None:
+            return None
+
+        key = (asset, metric, interval)
+        table = self._tables.get(key)
+        if table is not None and table.length == meta['length']:
+            return table
+
+        length = meta['length']
+        times = self._map(os.path.join(directory, 'times'), '<i8', length)
+        columns = {name: self._map(os.path.join(directory, f'col_{i}'), dtype, length)
+                   for i, (name, dtype) in enumerate(meta['columns'])}
+
+        table = _Table(length, times, columns)
+        self._tables[key] = table
+        return table
+
+    def last_time(self, asset: str, metric: str, interval: int) -> int:
+        table = self._table(asset, metric, interval)
+        if table is None or table.length == 0:
+            return None
+        return int(table.times[-1])
+
+    def append(self, asset: str, metric: str, interval: int, times: np.ndarray, columns: dict[str, np.ndarray]) -> int:
+        """
+        Appends rows newer than the last stored one, returns how many were
+        written. The first append fixes the table's columns and dtypes.
+        """
+        times = np.asarray(times, dtype='<i8')
+        order = np.argsort(times, kind='stable')
+        times = times[order]
+
+        directory = self._dir(asset, metric, interval)
+        meta = self._meta(directory)
+        if meta is None:
+            os.makedirs(directory, exist_ok=True)
+            meta = {
+                'length': 0,
+                'columns': [(name, np.asarray(values).dtype.newbyteorder('<').str)
+                            for name, values in columns.items()],
+            }
+        elif set(columns) != {name for name, _ in meta['columns']}:
+            raise ValueError(
+                f'columns {sorted(columns)} do not match the stored '
+                f'{sorted(name for name, _ in meta["columns"])}')
+
+        last = self.last_time(asset, metric, interval)
+        keep = np.ones(len(times), dtype=bool)
+        if last is not None:
+            keep &= times > last
+        # Only the first of duplicate times within the batch
+        keep[1:] &= times[1:] != times[:-1]
+        if not keep.any():
+            return 0
+
+        # Drop anything an interrupted append left past the stored length,
+        # so the new rows land straight after the last committed one
+        length = meta['length']
+        self._truncate(os.path.join(directory, 'times'), length * 8)
+        for i, (_, dtype) in enumerate(meta['columns']):
+            self._truncate(os.path.join(directory, f'col_{i}'),
+                           length * np.dtype(dtype).itemsize)
+
+        with open(os.path.join(directory, 'times'), 'ab') as f:
+            f.write(times[keep].tobytes())
+        for i, (name, dtype) in enumerate(meta['columns']):
+            values = np.asarray(columns[name])[order][keep].astype(dtype)
+            with open(os.path.join(directory, f'col_{i}'), 'ab') as f:
+                f.write(values.tobytes())
+
+        written = int(keep.sum())
+        meta['length'] += written
+        self._write_meta(directory, meta)
+        return written
+
+    def append_frame(self, asset: str, metric: str, interval: int, frame: pd.DataFrame) -> int:
+        """
+        Appends a frame as returned by the crypto_requests getters, indexed
+        by time or with a 't' column of unix seconds
+        """
+        split = MetricCache._split(frame)
+        if split is None:
+            raise ValueError('frame has no time index or non-numeric columns')
+
+        _, _, _, times, columns = split
+        return self.append(asset, metric, interval, times, columns)
+
+    def read(self, asset: str, metric: str, interval: int,
+             start: int = None, end: int = None) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+        """
+        Read-only views of the times and columns between start and end
+        (inclusive unix seconds); empty arrays if nothing is stored
+        """
+        table = self._table(asset, metric, interval)
+        if table is None:
+            return np.empty(0, dtype=np.int64), {}
+
+        first = 0 if start is None else int(
+            np.searchsorted(table.times, start, side='left'))
+        last = table.length if end is None else int(
+            np.searchsorted(table.times, end, side='right'))
+
+        return table.times[first:last], {name: values[first:last]
+                                         for name, values in table.columns.items()}
+
+    def read_frame(self, asset: str, metric: str, interval: int,
+                   start: int = None, end: int = None) -> pd.DataFrame:
+        times, columns = self.read(asset, metric, interval, start, end)
+        index = pd.DatetimeIndex(pd.to_datetime(times, unit='s'), name='t')
+        return pd.DataFrame(columns, index=index, copy=False)
@@ -0,0 +1,266 @@
+from __future__ import annotations
+import functools
+import json
+import os
+import tempfile
+import time
+from typing import Callable
+import numpy as np
+import pandas as pd
+
+# fetch(asset, start, end) with unix second timestamps, as the getters in
+# shared_crypto_analysis.crypto_requests.request take them
+Fetcher = Callable[[str, int, int], pd.DataFrame]
+
+_INDEX_DATETIME = 'datetime'
+_INDEX_NUMERIC = 'numeric'
+_INDEX_COLUMN = 'column'
+
+
+def _merge_ranges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    ret = []
+    for start, end in sorted(ranges):
+        if ret and start <= ret[-1][1] + 1:
+            ret[-1] = (ret[-1][0], max(ret[-1][1], end))
+        else:
+            ret.append((start, end))
+
+    return ret
+
+
+def _missing_ranges(covered: list[tuple[int, int]], start: int, end: int) -> list[tuple[int, int]]:
+    """
+    Parts of start..end (inclusive) not inside any covered range
+    """
+    ret = []
+    cursor = start
+    for covered_start, covered_end in covered:
+        if covered_end < cursor:
+            continue
+        if covered_start > end:
+            break
+        if covered_start > cursor:
+            ret.append((cursor, covered_start - 1))
+        cursor = max(cursor, covered_end + 1)
+
+    if cursor <= end:
+        ret.append((cursor, end))
+
+    return ret
+
+
+class _Entry:
+    """
+    The cached rows and coverage of one (asset, metric, interval)
+    """
+
+    def __init__(self, index_kind: str = None, index_name: str = None, tz: str = None) -> None:
+        self.index_kind = index_kind
+        self.index_name = index_name
+        self.tz = tz
+        self.times = np.empty(0, dtype=np.int64)
+        self.columns: dict[str, np.ndarray] = {}
+        # Ranges of closed bars that are known to be complete
+        self.covered: list[tuple[int, int]] = []
+        # Range holding the still open bar, trusted until expires
+        self.open_range: tuple[int, int] = None
+        self.open_expires = 0.0
+
+    def coverage(self, now: float) -> list[tuple[int, int]]:
+        if self.open_range is not None and now < self.open_expires:
+            return _merge_ranges(self.covered + [self.open_range])
+        return self.covered
+
+
+class MetricCache:
+    """
+    Persistent cache for metric getters, keyed by (asset, metric, interval).
+
+    Each key is stored in its own .npz file as one array per column plus the
+    unix second time index, together with the time ranges already fetched.
+    Later calls only fetch the gaps, and the bar that is still open is
+    refetched once ttl seconds have passed. Frames whose columns are not
+    numeric are passed through uncached.
+
+        cache = MetricCache('~/.cache/crypto_visualizer')
+        get_price = cache.wrap(request.get_price, 'price')
+    """
+
+    def __init__(self, root: str, ttl: float = 300.0) -> None:
+        self.root = os.path.expanduser(root)
+        self.ttl = ttl
+        os.makedirs(self.root, exist_ok=True)
+
+    def wrap(self, fetch: Fetcher, metric: str, interval: int = 86400) -> Fetcher:
+        @functools.wraps(fetch)
+        def cached(asset: str, start: int, end: int) -> pd.DataFrame:
+            return self.get(fetch, asset, metric, start, end, interval)
+
+        return cached
+
+    def _path(self, asset: str, metric: str, interval: int) -> str:
+        return os.path.join(self.root, f'{asset}-{metric}-{interval}.npz')
+
+    def _load(self, path: str) -> _Entry:
+        if not os.path.exists(path):
+            return None
+
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+
+            entry = _Entry(meta['index_kind'], meta['index_name'], meta['tz'])
+            entry.times = data['times']
+            entry.columns = {name: data[f'col_{i}']
+                             for i, name in enumerate(meta['columns'])}
+            entry.covered = [tuple(r) for r in data['covered'].tolist()]
+            if meta['open_range'] is not None:
+                entry.open_range = tuple(meta['open_range'])
+                entry.open_expires = meta['open_expires']
+
+        return entry
+
+    def _save(self, path: str, entry: _Entry) -> None:
+        meta = {
+            'index_kind': entry.index_kind,
+            'index_name': entry.index_name,
+            'tz': entry.tz,
+            'columns': list(entry.columns),
+            'open_range': entry.open_range,
+            'open_expires': entry.open_expires,
+        }
+        arrays = {f'col_{i}': values
+                  for i, values in enumerate(entry.columns.values())}
+
+        # Write next to the target and swap in, so readers never see a
+        # partially written file
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.npz')
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), times=entry.times,
+                     covered=np.array(entry.covered, dtype=np.int64).reshape(-1, 2),
+                     **arrays)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _split(frame: pd.DataFrame) -> tuple[str, str, str, np.ndarray, dict[str, np.ndarray]]:
+        """
+        (index kind, index name, tz, unix second times, columns) of a fetched
+        frame, or None if it cannot be stored
+        """
+        tz = None
+        if isinstance(frame.index, pd.DatetimeIndex):
+            kind, name = _INDEX_DATETIME, frame.index.name
+            tz = None if frame.index.tz is None else str(frame.index.tz)
+            epoch = pd.Timestamp(0, tz=frame.index.tz)
+            times = ((frame.index - epoch) //
+                     pd.Timedelta(seconds=1)).to_numpy(np.int64)
+        elif 't' in frame.columns:
+            kind, name = _INDEX_COLUMN, 't'
+            times = frame['t'].to_numpy(np.int64)
+            frame = frame.drop(columns='t')
+        elif pd.api.types.is_integer_dtype(frame.index):
+            kind, name = _INDEX_NUMERIC, frame.index.name
+            times = frame.index.to_numpy(np.int64)
+        else:
+            return None
+
+        # An empty frame only tells us the range holds no rows; its column
+        # dtypes are often object, so are not looked at
+        if len(frame) == 0:
+            return kind, name, tz, times, {}
+
+        columns = {}
+        for column in frame.columns:
+            values = frame[column].to_numpy()
+            if not isinstance(column, str) or values.dtype.kind not in 'biuf':
+                return None
+            columns[column] = values
+
+        return kind, name, tz, times, columns
+
+    @staticmethod
+    def _frame(entry: _Entry, start: int, end: int) -> pd.DataFrame:
+        mask = (entry.times >= start) & (entry.times <= end)
+        times = entry.times[mask]
+        data = {name: values[mask] for name, values in entry.columns.items()}
+
+        if entry.index_kind is None:
+            # Every fetch so far came back empty
+            return pd.DataFrame(data)
+
+        if entry.index_kind == _INDEX_DATETIME:
+            index = pd.to_datetime(times, unit='s', utc=entry.tz is not None)
+            if entry.tz is not None:
+                index = index.tz_convert(entry.tz)
+            return pd.DataFrame(data, index=pd.DatetimeIndex(index, name=entry.index_name))
+
+        if entry.index_kind == _INDEX_COLUMN:
+            return pd.DataFrame({'t': times, **data})
+
+        return pd.DataFrame(data, index=pd.Index(times, name=entry.index_name))
+
+    def get(self, fetch: Fetcher, asset: str, metric: str, start: int, end: int, interval: int = 86400) -> pd.DataFrame:
+        if start > end:
+            raise ValueError(f'start {start} is after end {end}')
+
+        path = self._path(asset, metric, interval)
+        entry = self._load(path)
+
+        now = time.time()
+        covered = [] if entry is None else entry.coverage(now)
+        missing = _missing_ranges(covered, start, end)
+        if not missing:
+            return self._frame(entry, start, end)
+
+        fetched = [fetch(asset, gap_start, gap_end)
+                   for gap_start, gap_end in missing]
+
+        parts = []
+        for frame in fetched:
+            split = self._split(frame)
+            if split is None:
+                # Not storable, hand back what the getter gives us
+                if missing == [(start, end)]:
+                    return frame
+                return fetch(asset, start, end)
+            parts.append(split)
+
+        if entry is None:
+            entry = _Entry()
+
+        # The index kind and columns come from the first rows seen; empty
+        # parts (a range before the asset listed, say) often carry a
+        # default RangeIndex, and all parts are stored as unix seconds
+        # whatever index they arrived with
+        filled = [p for p in parts if len(p[3])]
+        if entry.index_kind is None and filled:
+            entry.index_kind, entry.index_name, entry.tz = filled[0][:3]
+
+        times = np.concatenate([entry.times] + [p[3] for p in parts])
+        names = list(entry.columns) or \
+            (list(filled[0][4]) if filled else [])
+        columns = {
+            name: np.concatenate(
+                [entry.columns.get(name, np.full(len(entry.times), np.nan))] +
+                [p[4].get(name, np.full(len(p[3]), np.nan)) for p in parts])
+            for name in names}
+
+        # New rows replace cached ones with the same time, so a refetched
+        # open bar overwrites its stale value
+        reversed_unique = np.unique(times[::-1], return_index=True)[1]
+        keep = len(times) - 1 - reversed_unique
+        entry.times = times[keep]
+        entry.columns = {name: values[keep]
+                         for name, values in columns.items()}
+
+        # Everything before the open bar is final; the open bar is only
+        # trusted for ttl seconds
+        open_start = int(now // interval * interval)
+        closed = [(a, min(b, open_start - 1))
+                  for a, b in missing if a < open_start]
+        entry.covered = _merge_ranges(entry.covered + closed)
+        if any(b >= open_start for _, b in missing):
+            entry.open_range = (open_start, end)
+            entry.open_expires = now + self.ttl
+
+        self._save(path, entry)
+        return self._frame(entry, start, end)
@@ -0,0 +1,130 @@
+"""
+Incremental indicator state for live panels.
+
+Every indicator is built once, warmed up on history, then fed one bar at a
+time with update(). Passing closed=False marks the bar as still open: the
+value is computed from the last closed state without committing it, so
+repeated updates of the open bar overwrite each other and cost O(1).
+"""
+from __future__ import annotations
+import math
+from typing import Protocol
+import numpy as np
+
+
+class Bar(Protocol):
+    high: float
+    low: float
+    close: float
+
+
+class StreamingEMA:
+    """
+    Exponential moving average seeded with the simple average of the first
+    period values; alpha defaults to 2 / (period + 1)
+    """
+
+    def __init__(self, period: int, alpha: float = None) -> None:
+        self.period = period
+        self.alpha = 2.0 / (period + 1) if alpha is None else alpha
+
+        # Committed state, only advanced by closed values
+        self._count = 0
+        self._seed_sum = 0.0
+        self._ema = math.nan
+
+        self.value = math.nan
+
+    @property
+    def ready(self) -> bool:
+        return self._count >= self.period
+
+    def _next(self, value: float) -> tuple[int, float, float]:
+        count = self._count + 1
+
+        if count < self.period:
+            return count, self._seed_sum + value, math.nan
+        if count == self.period:
+            seed_sum = self._seed_sum + value
+            return count, seed_sum, seed_sum / self.period
+
+        return count, self._seed_sum, self._ema + self.alpha * (value - self._ema)
+
+    def update(self, value: float, closed: bool = True) -> float:
+        count, seed_sum, ema = self._next(value)
+
+        if closed:
+            self._count, self._seed_sum, self._ema = count, seed_sum, ema
+
+        self.value = ema
+        return ema
+
+    def seed(self, values: np.ndarray) -> float:
+        for value in np.asarray(values, dtype=np.float64).tolist():
+            self.update(value)
+        return self.value
+
+
+class StreamingRMA(StreamingEMA):
+    """
+    Wilder's running moving average, alpha = 1 / period
+    """
+
+    def __init__(self, period: int) -> None:
+        super().__init__(period, 1.0 / period)
+
+
+class StreamingTrueRange:
+    def __init__(self) -> None:
+        self._prev_close = math.nan
+        self.value = math.nan
+
+    def update(self, bar: Bar, closed: bool = True) -> float:
+        if math.isnan(self._prev_close):
+            true_range = bar.high - bar.low
+        else:
+            true_range = max(bar.high, self._prev_close) - \
+                min(bar.low, self._prev_close)
+
+        if closed:
+            self._prev_close = bar.close
+
+        self.value = true_range
+        return true_range
+
+
+class StreamingATR:
+    """
+    Average true range with Wilder smoothing
+    """
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self._true_range = StreamingTrueRange()
+        self._average = StreamingRMA(period)
+        self.value = math.nan
+
+    @property
+    def ready(self) -> bool:
+        return self._average.ready
+
+    def update(self, bar: Bar, closed: bool = True) -> float:
+        true_range = self._true_range.update(bar, closed)
+        self.value = self._average.update(true_range, closed)
+        return self.value
+
+    def seed(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> float:
+        for high, low, close in zip(np.asarray(highs, dtype=np.float64).tolist(),
+                                    np.asarray(lows, dtype=np.float64).tolist(),
+                                    np.asarray(closes, dtype=np.float64).tolist()):
+            self.update(_SeedBar(high, low, close))
+        return self.value
+
+
+class _SeedBar:
+    __slots__ = ('high', 'low', 'close')
+
+    def __init__(self, high: float, low: float, close: float) -> None:
+        self.high = high
+        self.low = low
+        self.close = close
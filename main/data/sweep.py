@@ -0,0 +1,143 @@
+"""
+Parallel parameter sweeps over indicators.
+
+The price arrays are copied once into shared memory and every worker maps
+them as read-only NumPy views, so nothing is pickled per task. Each
+parameter combination is passed to evaluate(data, **params), which
+returns a dict of result values, and the sweep collects one row per
+combination.
+
+Work that does not depend on every parameter goes through intermediate(),
+which memoises it per worker; true_range() and atr() below are computed
+once per worker and once per period rather than once per combination.
+
+    def score(data, period, atr_factor):
+        band = atr(data, period) * atr_factor
+        return {'hits': int((data['high'] - data['close'] > band).sum())}
+
+    table = sweep(score, {'period': range(5, 50), 'atr_factor': [1, 1.5, 2, 3]},
+                  {'high': highs, 'low': lows, 'close': closes})
+
+score has to be a module level function so the workers can import it.
+"""
+from __future__ import annotations
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Hashable, Iterable
+import numpy as np
+import pandas as pd
+
+# evaluate(data, **params) -> {result name: value}
+Evaluate = Callable[..., dict[str, Any]]
+
+# Per process state: the mapped arrays and memoised intermediates
+_data: dict[str, np.ndarray] = {}
+_blocks: list[shared_memory.SharedMemory] = []
+_intermediates: dict[Hashable, Any] = {}
+
+
+def intermediate(key: Hashable, compute: Callable[[], Any]) -> Any:
+    """
+    compute() the first time key is asked for in this process, the cached
+    value afterwards
+    """
+    if key not in _intermediates:
+        _intermediates[key] = compute()
+    return _intermediates[key]
+
+
+def true_range(data: dict[str, np.ndarray]) -> np.ndarray:
+    def compute() -> np.ndarray:
+        high, low, close = data['high'], data['low'], data['close']
+        prev_close = np.concatenate(([close[0]], close[:-1]))
+        return np.maximum(high, prev_close) - np.minimum(low, prev_close)
+
+    return intermediate('true_range', compute)
+
+
+def atr(data: dict[str, np.ndarray], period: int) -> np.ndarray:
+    """
+    Wilder's average true range, NaN until period bars have been seen
+    """
+    def compute() -> np.ndarray:
+        ranges = true_range(data)
+        ret = np.full(len(ranges), np.nan)
+        if len(ranges) < period:
+            return ret
+
+        current = ranges[:period].mean()
+        ret[period - 1] = current
+        for i, value in enumerate(ranges[period:].tolist(), period):
+            current += (value - current) / period
+            ret[i] = current
+        return ret
+
+    return intermediate(('atr', period), compute)
+
+
+def _attach(descriptors: dict[str, tuple[str, tuple[int, ...], str]]) -> None:
+    for name, (block_name, shape, dtype) in descriptors.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _blocks.append(block)
+
+        view = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        view.flags.writeable = False
+        _data[name] = view
+
+
+def _run(evaluate: Evaluate, params: dict[str, Any]) -> dict[str, Any]:
+    return {**params, **evaluate(_data, **params)}
+
+
+def sweep(evaluate: Evaluate, grid: dict[str, Iterable], arrays: dict[str, np.ndarray],
+          workers: int = None, chunksize: int = None) -> pd.DataFrame:
+    """
+    Runs evaluate on every combination of the values in grid and returns a
+    table with one column per parameter and per result.
+
+    Combinations are handed out in grid order and in contiguous chunks, so
+    ones sharing their leading parameters tend to land on the same worker
+    and reuse its intermediates; put the parameter that intermediates
+    depend on first.
+    """
+    names = list(grid)
+    combinations = [dict(zip(names, values))
+                    for values in itertools.product(*grid.values())]
+
+    workers = min(workers or os.cpu_count() or 1, len(combinations))
+    if workers <= 1:
+        _data.clear()
+        _data.update(arrays)
+        _intermediates.clear()
+        try:
+            rows = [_run(evaluate, params) for params in combinations]
+        finally:
+            _data.clear()
+            _intermediates.clear()
+        return pd.DataFrame(rows)
+
+    blocks = []
+    try:
+        descriptors = {}
+        for name, values in arrays.items():
+            values = np.ascontiguousarray(values)
+            block = shared_memory.SharedMemory(
+                create=True, size=max(values.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(values.shape, dtype=values.dtype,
+                       buffer=block.buf)[...] = values
+            descriptors[name] = (block.name, values.shape, values.dtype.str)
+
+        chunksize = chunksize or max(1, len(combinations) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(descriptors,)) as pool:
+            rows = list(pool.map(_run, itertools.repeat(evaluate),
+                                 combinations, chunksize=chunksize))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return pd.DataFrame(rows)
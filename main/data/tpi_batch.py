@@ -0,0 +1,106 @@
+"""
+Vectorised trend probability scoring over many assets at once.
+
+Prices are a 2-D (time x asset) array and every component maps it to a
+score array of the same shape, so each component is one pass over time
+that is vectorised across the asset axis. Components are plain module
+level functions bound with functools.partial, which keeps them picklable
+for the worker processes used on large universes.
+
+    components = {
+        'ema 12/26': partial(ema_cross, fast=12, slow=26),
+        'sma 50': partial(above_sma, period=50),
+        'roc 20': partial(roc_sign, period=20),
+    }
+    scores = evaluate(prices, components)
+    tpi = scores.mean(axis=2)
+"""
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+import numpy as np
+
+# component(prices) -> scores, both (time, asset)
+Component = Callable[[np.ndarray], np.ndarray]
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    EMA down the time axis, seeded with each asset's first price. Rows
+    before an asset starts trading stay NaN; a NaN after that holds the
+    last average, as pandas' ewm(adjust=False, ignore_na=True) does
+    """
+    alpha = 2.0 / (period + 1)
+    ret = np.empty_like(values, dtype=np.float64)
+
+    current = values[0].astype(np.float64)
+    ret[0] = current
+    for i in range(1, len(values)):
+        row = values[i]
+        current = np.where(np.isnan(current), row,
+                           np.where(np.isnan(row), current,
+                                    current + alpha * (row - current)))
+        ret[i] = current
+
+    return ret
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    cumulative = np.nancumsum(values, axis=0, dtype=np.float64)
+    ret = np.full(values.shape, np.nan)
+    ret[period - 1:] = cumulative[period - 1:]
+    ret[period:] -= cumulative[:-period]
+    ret[period - 1:] /= period
+
+    # Windows reaching back before an asset's first price have no average
+    missing = np.cumsum(np.isnan(values), axis=0)
+    incomplete = missing[period - 1:].copy()
+    incomplete[1:] -= missing[:-period]
+    ret[period - 1:][incomplete > 0] = np.nan
+
+    return ret
+
+
+def ema_cross(prices: np.ndarray, fast: int, slow: int) -> np.ndarray:
+    return np.sign(ema(prices, fast) - ema(prices, slow))
+
+
+def above_sma(prices: np.ndarray, period: int) -> np.ndarray:
+    return np.sign(prices - sma(prices, period))
+
+
+def roc_sign(prices: np.ndarray, period: int) -> np.ndarray:
+    ret = np.full(prices.shape, np.nan)
+    ret[period:] = np.sign(prices[period:] - prices[:-period])
+
+    return ret
+
+
+def _evaluate_block(prices: np.ndarray, components: list[Component]) -> np.ndarray:
+    return np.stack([component(prices) for component in components], axis=2)
+
+
+def evaluate(prices: np.ndarray, components: dict[str, Component],
+             workers: int = None, min_assets_per_worker: int = 64) -> np.ndarray:
+    """
+    Scores of every component for every asset, shaped (time, asset,
+    component) in the order of components.
+
+    Universes with more than min_assets_per_worker assets are split by
+    column across up to workers processes (default: one per CPU).
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    components = list(components.values())
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, prices.shape[1] // min_assets_per_worker)
+    if workers <= 1:
+        return _evaluate_block(prices, components)
+
+    blocks = np.array_split(prices, workers, axis=1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_evaluate_block, blocks,
+                                [components] * len(blocks)))
+
+    return np.concatenate(results, axis=1)
@@ -0,0 +1,47 @@
+import time
+
+
+class FrameScheduler:
+    """
+    Decides when the main loop should redraw and how long it may sleep.
+
+    Anything that changes what is on screen calls mark_dirty(); the loop only
+    draws when the scheduler is dirty, and never faster than max_fps. While
+    idle the loop sleeps for idle_timeout seconds between event checks.
+    """
+
+    def __init__(self, max_fps: float = 60.0, idle_timeout: float = 0.5) -> None:
+        self._min_frame_time = 1.0 / max_fps
+        self._idle_timeout = idle_timeout
+        self._dirty = True
+        self._last_frame = 0.0
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def mark_dirty(self, *args, **kwargs) -> None:
+        # Accepts and ignores arguments so it can be registered directly as a
+        # property or glfw callback
+        self._dirty = True
+
+    def should_draw(self) -> bool:
+        if not self._dirty:
+            return False
+
+        return time.perf_counter() - self._last_frame >= self._min_frame_time
+
+    def frame_drawn(self) -> None:
+        self._dirty = False
+        self._last_frame = time.perf_counter()
+
+    def timeout(self) -> float:
+        """
+        Seconds the loop may block waiting for events; 0.0 means poll.
+        """
+        if not self._dirty:
+            return self._idle_timeout
+
+        remaining = self._min_frame_time - \
+            (time.perf_counter() - self._last_frame)
+        return max(0.0, remaining)
@@ -0,0 +1,39 @@
+from __future__ import annotations
+import time
+from typing import Protocol
+import skia
+from .context_wrapper import ContextWrapper, ContextWrapperSkia
+
+
+class Drawable(Protocol):
+    def draw(self, context: ContextWrapper) -> None:
+        ...
+
+
+class HeadlessRenderer:
+    """
+    Renders into a CPU raster surface instead of a GLFW window, for
+    benchmarks and environments without a display.
+    """
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.surface = skia.Surface(width, height)
+        self.context = ContextWrapperSkia(self.surface.getCanvas())
+
+    def render(self, drawable: Drawable) -> float:
+        """
+        Clears and draws one frame, returning the time taken in seconds
+        """
+        start = time.perf_counter()
+
+        canvas = self.surface.getCanvas()
+        canvas.clear(skia.ColorBLACK)
+        drawable.draw(self.context)
+        self.surface.flushAndSubmit()
+
+        return time.perf_counter() - start
+
+    def snapshot(self) -> skia.Image:
+        return self.surface.makeImageSnapshot()
@@ -1,3 +1,4 @@
+import itertools
 from enum import Enum, auto
 
 
@@ -10,7 +11,45 @@ class MOUSE_ACTION(Enum):
 
 
 class Color():
-    def __init__(self, r: int, g: int, b: int) -> None:
-        self.r = r
-        self.g = g
-        self.b = b
+    """
+    Immutable and interned, so every Color(r, g, b) with the same
+    components is the same object and can be compared and hashed by
+    identity
+    """
+    __slots__ = ('r', 'g', 'b', 'argb')
+
+    _interned: dict[tuple[int, int, int], 'Color'] = {}
+
+    def __new__(cls, r: int, g: int, b: int) -> 'Color':
+        key = (r, g, b)
+        ret = cls._interned.get(key)
+        if ret is None:
+            ret = super().__new__(cls)
+            object.__setattr__(ret, 'r', r)
+            object.__setattr__(ret, 'g', g)
+            object.__setattr__(ret, 'b', b)
+            # Opaque color packed as 0xAARRGGBB, the form batched draws take
+            object.__setattr__(ret, 'argb', 0xFF000000 |
+                               (r << 16) | (g << 8) | b)
+            ret = cls._interned.setdefault(key, ret)
+
+        return ret
+
+    def __setattr__(self, name, value) -> None:
+        raise AttributeError('Color is immutable')
+
+    def __reduce__(self):
+        return (Color, (self.r, self.g, self.b))
+
+    def __repr__(self) -> str:
+        return f'Color({self.r}, {self.g}, {self.b})'
+
+
+_ids = itertools.count(1)
+
+
+def next_id() -> int:
+    """
+    Process unique id for scene objects, cheaper than a uuid
+    """
+    return next(_ids)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+from typing import Callable
+from shared_crypto_analysis.shared_python.shared_math.geometry import Vec2
+from .helpers import MOUSE_ACTION
+
+_ACTION = 0
+_SCROLL = 1
+
+
+class InputQueue:
+    """
+    Pointer input collected from the GLFW callbacks between frames and
+    applied once per frame.
+
+    Consecutive drags collapse into the latest position, as the scene only
+    needs where the drag has got to, and consecutive scrolls share one
+    queue entry. Scroll steps are still applied one by one, as zooming
+    clamps after every step. Everything else is kept in order, so a drag
+    is never merged across a press or release.
+    """
+
+    def __init__(self) -> None:
+        self._events: list[list] = []
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def push_action(self, action: MOUSE_ACTION, x: float, y: float) -> None:
+        if action == MOUSE_ACTION.LEFT_CLICK_DRAG and self._events:
+            last = self._events[-1]
+            if last[0] == _ACTION and last[1] == MOUSE_ACTION.LEFT_CLICK_DRAG:
+                last[2] = x
+                last[3] = y
+                return
+
+        self._events.append([_ACTION, action, x, y])
+
+    def push_scroll(self, xoffset: float, yoffset: float) -> None:
+        if self._events and self._events[-1][0] == _SCROLL:
+            self._events[-1][1].append((xoffset, yoffset))
+            return
+
+        self._events.append([_SCROLL, [(xoffset, yoffset)]])
+
+    def flush(self, mouse_action: Callable[[MOUSE_ACTION, Vec2], bool],
+              mouse_scroll: Callable[[float, float], bool]) -> bool:
+        """
+        Applies and clears the queued input, returns whether there was any
+        """
+        events, self._events = self._events, []
+
+        for event in events:
+            if event[0] == _ACTION:
+                mouse_action(event[1], Vec2(event[2], event[3]))
+            else:
+                for xoffset, yoffset in event[1]:
+                    mouse_scroll(xoffset, yoffset)
+
+        return bool(events)
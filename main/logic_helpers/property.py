@@ -10,6 +10,9 @@ class _Event(object):
         self.callbacks.append(callback)
         return callback
 
+    def unregister(self, callback):
+        self.callbacks.remove(callback)
+
     @classmethod
     def watched_property(cls, event_name, key):
         actual_key = '_%s' % key
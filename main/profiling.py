@@ -0,0 +1,165 @@
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING
+import numpy as np
+from .helpers import Color
+
+if TYPE_CHECKING:
+    from .context_wrapper import ContextWrapper
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('_profiler', '_name', '_start')
+
+    def __init__(self, profiler: Profiler, name: str) -> None:
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._profiler._record(
+            self._name, self._start, time.perf_counter_ns())
+
+
+class FrameStats:
+    def __init__(self, index: int, start_ns: int) -> None:
+        self.index = index
+        self.start_ns = start_ns
+        self.duration_ns = 0
+        # span name -> (calls, total ns) within this frame
+        self.spans: dict[str, tuple[int, int]] = {}
+
+
+class Profiler:
+    """
+    Named timing spans grouped into frames.
+
+    Disabled by default, in which case span() hands back a shared no-op
+    context manager and nothing is recorded. Spans may be recorded from any
+    thread, but only those on the thread running the frames count towards
+    its FrameStats; the rest only appear in the exported trace.
+    """
+
+    # Frame time the HUD bars are scaled against, 60 fps
+    FRAME_BUDGET_NS = 16_666_667
+
+    def __init__(self, history: int = 240, max_events: int = 100_000) -> None:
+        self.enabled = False
+        self.hud = False
+
+        self._frames: deque[FrameStats] = deque(maxlen=history)
+        self._events: deque[tuple[str, int, int, int]] = deque(
+            maxlen=max_events)
+        self._current = None
+        self._frame_thread = None
+        self._frame_index = 0
+
+    def span(self, name: str):
+        if not self.enabled:
+            return _NULL_SPAN
+
+        return _Span(self, name)
+
+    def _record(self, name: str, start_ns: int, end_ns: int) -> None:
+        thread = threading.get_ident()
+        self._events.append((name, start_ns, end_ns, thread))
+
+        # Read once, end_frame may clear it between the check and the use
+        current = self._current
+        if current is not None and thread == self._frame_thread:
+            calls, total = current.spans.get(name, (0, 0))
+            current.spans[name] = (calls + 1, total + end_ns - start_ns)
+
+    def begin_frame(self) -> None:
+        if not self.enabled:
+            return
+
+        self._frame_thread = threading.get_ident()
+        self._current = FrameStats(self._frame_index, time.perf_counter_ns())
+        self._frame_index += 1
+
+    def end_frame(self) -> None:
+        if self._current is None:
+            return
+
+        end_ns = time.perf_counter_ns()
+        self._current.duration_ns = end_ns - self._current.start_ns
+        self._record('frame', self._current.start_ns, end_ns)
+
+        self._frames.append(self._current)
+        self._current = None
+
+    @property
+    def frames(self) -> list[FrameStats]:
+        return list(self._frames)
+
+    def export_trace(self, path: str) -> None:
+        """
+        Writes the recorded spans in Chrome's trace event format, viewable in
+        chrome://tracing or Perfetto
+        """
+        pid = os.getpid()
+        events = [{
+            'name': name,
+            'ph': 'X',
+            'ts': start_ns / 1000.0,
+            'dur': (end_ns - start_ns) / 1000.0,
+            'pid': pid,
+            'tid': tid,
+        } for name, start_ns, end_ns, tid in self._events]
+
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events}, f)
+
+    def draw_hud(self, context: ContextWrapper, x: float, y: float, width: float, height: float) -> None:
+        """
+        Bar graph of recent frame times, one bar per frame; the line marks
+        the frame budget and bars over it turn red
+        """
+        frames = self._frames
+        if not frames:
+            return
+
+        durations = np.array([frame.duration_ns for frame in frames],
+                             dtype=np.float64)
+        bar_width = width / frames.maxlen
+        bar_heights = np.minimum(
+            durations / (self.FRAME_BUDGET_NS * 2), 1.0) * height
+
+        # Background, one bar per frame, then the budget line on top
+        rects = np.empty((len(durations) + 2, 4))
+        rects[0] = (x, y, width, height)
+        rects[1:-1, 0] = x + np.arange(len(durations)) * bar_width
+        rects[1:-1, 1] = y + height - bar_heights
+        rects[1:-1, 2] = bar_width
+        rects[1:-1, 3] = bar_heights
+        rects[-1] = (x, y + height / 2, width, 1.0)
+
+        colors = np.empty(len(rects), dtype=np.uint32)
+        colors[0] = Color(20, 20, 20).argb
+        colors[1:-1] = np.where(durations > self.FRAME_BUDGET_NS,
+                                Color(220, 50, 50).argb, Color(50, 200, 80).argb)
+        colors[-1] = Color(200, 200, 200).argb
+
+        context.draw_rects(rects, colors)
+
+
+profiler = Profiler()
@@ -1,28 +1,33 @@
 from __future__ import annotations
-import uuid
+import math
+from collections import OrderedDict
 from typing import Protocol
-from copy import deepcopy
 import numpy as np
-from ....context_wrapper import ContextWrapper, path_provider
-from ....helpers import Color
-from shared_crypto_analysis.shared_python.shared_math.geometry import Vec2, BezierPathA, BezierPath, BezierContour, BezierPoint
+from ....context_wrapper import ContextWrapper, ContextPath, lines_provider
+from ....helpers import Color, next_id
+from ....profiling import profiler
 from ...properties import TIME_INTERVAL
 
 
 class TransformProvider(Protocol):
-    def width(self) -> float:
-        ...
-
-    def height(self) -> float:
+    @property
+    def scale_factor(self) -> float:
         ...
 
-    def matrix(self) -> np.ndarray:
+    def visible_rect(self) -> tuple[float, float, float, float]:
         ...
 
 
 class Grid:
+    # Closest two grid lines may get on screen before the spacing doubles
+    MIN_SCREEN_SPACING = 8.0
+    # Grid cells along each side of a tile
+    TILE_CELLS = 32
+    # Tiles kept across all zoom levels
+    MAX_TILES = 256
+
     def __init__(self, transform_provider: TransformProvider) -> None:
-        self.id = uuid.uuid4()
+        self.id = next_id()
         self._transform = transform_provider
         self._regenerate = True
 
@@ -31,10 +36,11 @@ class Grid:
         self._interval = None
 
         # Grid specific variables
-        self._path = None
         self._stroke_thickness = 0.03
-        self._context_path = path_provider()(
-            None, Color(255, 255, 255), None, self._stroke_thickness)
+        # Bumped whenever the tile cache is thrown away
+        self._generation = 0
+        self._tiles: OrderedDict[tuple[int, int, int], ContextPath] = \
+            OrderedDict()
 
     @property
     def grid_width(self) -> int:
@@ -44,6 +50,7 @@ class Grid:
     def grid_width(self, grid_width: int) -> None:
         # Should only be called by session properties as a callback
         self._grid_width = grid_width
+        self._regenerate = True
 
     @property
     def interval(self) -> TIME_INTERVAL:
@@ -55,40 +62,94 @@ class Grid:
         self._interval = interval
         self._regenerate = True
 
-    def _regenerate_path(self):
-        self._path = BezierPathA()
-
-        start = BezierPath()
-        start_c = BezierContour(False)
-        start_c.add_point(BezierPoint(
-            Vec2(-self._transform.width, -self._transform.height)))
-        start_c.add_point(BezierPoint(
-            Vec2(-self._transform.width, self._transform.height)))
-        start.add_contour(start_c)
-
-        start_y = BezierPath()
-        start_y_c = BezierContour(False)
-        start_y_c.add_point(BezierPoint(
-            Vec2(-self._transform.width, -self._transform.height)))
-        start_y_c.add_point(BezierPoint(
-            Vec2(self._transform.width, -self._transform.height)))
-        start_y.add_contour(start_y_c)
-
-        for x in range(0, self._transform.width * 2, self.grid_width):
-            self._path.paths.append(start)
-            start = deepcopy(start)
-            start.translate(Vec2(self.grid_width, 0.0))
-
-        for y in range(0, self._transform.width * 2, self.grid_width):
-            self._path.paths.append(start_y)
-            start_y = deepcopy(start_y)
-            start_y.translate(Vec2(0.0, self.grid_width))
-
-        self._context_path.set_path(self._path)
-
-    def draw(self, context: ContextWrapper) -> None:
+    def _level(self) -> int:
+        """
+        Level of detail for the current zoom; line spacing is
+        grid_width * 2 ** level
+        """
+        screen_spacing = self.grid_width * self._transform.scale_factor
+        if screen_spacing >= self.MIN_SCREEN_SPACING:
+            return 0
+
+        return math.ceil(math.log2(self.MIN_SCREEN_SPACING / screen_spacing))
+
+    def _regenerate_path(self, level: int, tx: int, ty: int) -> ContextPath:
+        spacing = self.grid_width * 2 ** level
+        tile_size = spacing * self.TILE_CELLS
+        left, top = tx * tile_size, ty * tile_size
+        right, bottom = left + tile_size, top + tile_size
+
+        # Each tile owns the lines on its left and top edge, so neighbouring
+        # tiles never draw the same line twice
+        steps = np.arange(self.TILE_CELLS) * spacing
+        xs = left + steps
+        ys = top + steps
+
+        x_lines = np.empty((self.TILE_CELLS, 4))
+        x_lines[:, 0] = xs
+        x_lines[:, 1] = top
+        x_lines[:, 2] = xs
+        x_lines[:, 3] = bottom
+
+        y_lines = np.empty((self.TILE_CELLS, 4))
+        y_lines[:, 0] = left
+        y_lines[:, 1] = ys
+        y_lines[:, 2] = right
+        y_lines[:, 3] = ys
+
+        return lines_provider()(
+            [x_lines, y_lines], Color(255, 255, 255), None,
+            self._stroke_thickness * 2 ** level)
+
+    def _tile(self, level: int, tx: int, ty: int) -> ContextPath:
+        key = (level, tx, ty)
+
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            return tile
+
+        with profiler.span('Grid._regenerate_path'):
+            tile = self._regenerate_path(level, tx, ty)
+        self._tiles[key] = tile
+        if len(self._tiles) > self.MAX_TILES:
+            self._tiles.popitem(last=False)
+
+        return tile
+
+    def _visible_tiles(self) -> tuple[int, int, int, int, int]:
+        """
+        (level, first tx, last tx, first ty, last ty) of the tiles covering
+        the visible rect
+        """
         if self._regenerate:
-            self._regenerate_path()
+            self._tiles.clear()
+            self._generation += 1
             self._regenerate = False
 
-        context.draw_path(self._context_path)
+        level = self._level()
+        tile_size = self.grid_width * 2 ** level * self.TILE_CELLS
+
+        left, top, right, bottom = self._transform.visible_rect()
+        return (level,
+                math.floor(left / tile_size), math.floor(right / tile_size),
+                math.floor(top / tile_size), math.floor(bottom / tile_size))
+
+    def content_key(self) -> tuple:
+        """
+        Changes whenever draw would draw something different
+        """
+        return (self._generation,) + self._visible_tiles()
+
+    def content_bounds(self) -> tuple[float, float, float, float]:
+        level, tx0, tx1, ty0, ty1 = self._visible_tiles()
+        tile_size = self.grid_width * 2 ** level * self.TILE_CELLS
+        return (tx0 * tile_size, ty0 * tile_size,
+                (tx1 + 1) * tile_size, (ty1 + 1) * tile_size)
+
+    def draw(self, context: ContextWrapper) -> None:
+        level, tx0, tx1, ty0, ty1 = self._visible_tiles()
+
+        for tx in range(tx0, tx1 + 1):
+            for ty in range(ty0, ty1 + 1):
+                context.draw_path(self._tile(level, tx, ty))
@@ -0,0 +1,26 @@
+from __future__ import annotations
+from typing import Callable, Hashable
+from ...context_wrapper import ContextWrapper
+
+
+class PictureLayer:
+    """
+    A recorded picture of part of the scene, replayed every frame and only
+    re-recorded when its content key changes.
+    """
+
+    def __init__(self) -> None:
+        self._key = None
+        self._picture = None
+
+    def invalidate(self) -> None:
+        self._key = None
+        self._picture = None
+
+    def draw(self, context: ContextWrapper, key: Hashable, bounds: tuple[float, float, float, float],
+             draw: Callable[[ContextWrapper], None]) -> None:
+        if self._picture is None or key != self._key:
+            self._picture = context.record(bounds, draw)
+            self._key = key
+
+        context.draw_picture(self._picture)
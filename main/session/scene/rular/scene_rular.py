@@ -1,10 +1,9 @@
 from __future__ import annotations
-import uuid
 from typing import Protocol
 from copy import deepcopy
 import numpy as np
 from ....context_wrapper import ContextWrapper, path_provider
-from ....helpers import Color
+from ....helpers import Color, next_id
 from shared_crypto_analysis.shared_python.shared_math.geometry import Vec2, BezierPathA, BezierPath, BezierContour, BezierPoint
 from ...properties import TIME_INTERVAL
 
@@ -22,7 +21,7 @@ class TransformProvider(Protocol):
 
 class Rular:
     def __init__(self, transform_provider: TransformProvider) -> None:
-        self.id = uuid.uuid4()
+        self.id = next_id()
         self._transform = transform_provider
         self._regenerate = True
 
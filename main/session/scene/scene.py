@@ -4,9 +4,15 @@ from ...context_wrapper import ContextWrapper
 from ...helpers import MOUSE_ACTION, Color
 from .shapes.shapes import Shape
 from .grid.scene_grid import Grid
+from .spatial_index import SpatialGrid
+from .layers import PictureLayer
+from .tiles import TileCache
+from .series.series import Series
 
 
 class draggable():
+    __slots__ = ('current_pos', 'shape')
+
     def __init__(self, start_pos: Vec2, dragging_shape: Shape) -> None:
         self.current_pos = start_pos
         self.shape = dragging_shape
@@ -22,10 +28,25 @@ class Transform:
         self._width = 0.0
         self._height = 0.0
 
-        self.scale_factor = 1.0
-        self.pan_offset = Vec2(0.0, 0.0)
+        self._scale_factor = 1.0
+        self._pan_offset = Vec2(0.0, 0.0)
         self.zoom_center = Vec2(0.0, 0.0)
 
+        # Bumped on every change that affects the matrix; the matrix, its
+        # inverse and the visible rect are cached against it
+        self._version = 0
+        self._cache_version = -1
+        self._matrix = None
+        self._inverse = None
+        self._visible_rect = None
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _changed(self) -> None:
+        self._version += 1
+
     @property
     def width(self) -> int:
         return self._width
@@ -33,6 +54,7 @@ class Transform:
     @width.setter
     def width(self, s: float) -> None:
         self._width = s
+        self._changed()
 
     @property
     def height(self) -> int:
@@ -41,48 +63,121 @@ class Transform:
     @height.setter
     def height(self, s: float) -> None:
         self._height = s
+        self._changed()
+
+    @property
+    def scale_factor(self) -> float:
+        return self._scale_factor
+
+    @scale_factor.setter
+    def scale_factor(self, s: float) -> None:
+        self._scale_factor = s
+        self._changed()
+
+    @property
+    def pan_offset(self) -> Vec2:
+        # Assign a new offset rather than mutating this one, or the cached
+        # matrices will not notice the change
+        return self._pan_offset
+
+    @pan_offset.setter
+    def pan_offset(self, offset: Vec2) -> None:
+        self._pan_offset = offset
+        self._changed()
 
     def mouse_scroll(self, xoffset, yoffset) -> bool:
-        self.scale_factor += yoffset / 10.0
-        self.scale_factor = max(0.3, self.scale_factor)
+        self.scale_factor = max(0.3, self.scale_factor + yoffset / 10.0)
         return True
 
-    def matrix(self) -> np.ndarray:
-        pan_center = Vec2(self.width / 2, self.height / 2)
-        zoomed_pan_offset = self.pan_offset
+    def _update_cache(self) -> None:
+        if self._cache_version == self._version:
+            return
 
-        translation_to_center = np.array([
-            [1, 0, pan_center.x],
-            [0, 1, pan_center.y],
-            [0, 0, 1]
-        ])
+        # translation_to_center @ scaling @ translation_to_offset, written
+        # out directly as it is only ever a scale and a translation
+        s = self._scale_factor
+        tx = self._width / 2 + s * self._pan_offset.x
+        ty = self._height / 2 + s * self._pan_offset.y
 
-        scaling = np.array([
-            [self.scale_factor, 0, 0],
-            [0, self.scale_factor, 0],
-            [0, 0, 1]
+        self._matrix = np.array([
+            [s, 0.0, tx],
+            [0.0, s, ty],
+            [0.0, 0.0, 1.0]
         ])
-
-        translation_to_offset = np.array([
-            [1, 0, zoomed_pan_offset.x],
-            [0, 1, zoomed_pan_offset.y],
-            [0, 0, 1]
+        self._inverse = np.array([
+            [1.0 / s, 0.0, -tx / s],
+            [0.0, 1.0 / s, -ty / s],
+            [0.0, 0.0, 1.0]
         ])
+        self._matrix.flags.writeable = False
+        self._inverse.flags.writeable = False
+
+        self._visible_rect = (
+            -tx / s, -ty / s,
+            (self._width - tx) / s, (self._height - ty) / s)
 
-        cache_matrix = translation_to_center @ scaling @ translation_to_offset
+        self._cache_version = self._version
 
-        return cache_matrix
+    def matrix(self) -> np.ndarray:
+        """
+        World to screen matrix; read only, shared until the transform changes
+        """
+        self._update_cache()
+        return self._matrix
+
+    def inverse_matrix(self) -> np.ndarray:
+        """
+        Screen to world matrix; read only, shared until the transform changes
+        """
+        self._update_cache()
+        return self._inverse
+
+    def visible_rect(self) -> tuple[float, float, float, float]:
+        """
+        (left, top, right, bottom) of the world area covered by the screen
+        """
+        self._update_cache()
+        return self._visible_rect
+
+    def screen_to_world(self, points: np.ndarray) -> np.ndarray:
+        """
+        Maps an (N, 2) array of screen points to world space
+        """
+        m = self.inverse_matrix()
+        return np.asarray(points, dtype=np.float64) * m[0, 0] + m[:2, 2]
+
+    def world_to_screen(self, points: np.ndarray) -> np.ndarray:
+        """
+        Maps an (N, 2) array of world points to screen space
+        """
+        m = self.matrix()
+        return np.asarray(points, dtype=np.float64) * m[0, 0] + m[:2, 2]
+
+    def screen_to_world_point(self, pos: Vec2) -> Vec2:
+        m = self.inverse_matrix()
+        return Vec2(pos.x * m[0, 0] + m[0, 2], pos.y * m[1, 1] + m[1, 2])
 
     def apply_pan(self, pan_offset):
         scaled_pan_offset = pan_offset / self.scale_factor
-        self.pan_offset += scaled_pan_offset
+        self.pan_offset = self.pan_offset + scaled_pan_offset
 
 
 class Scene:
     def __init__(self):
         self._shapes = []
+        self._series = []
+        self._index = SpatialGrid()
         self._draggable = None
         self._selected = None
+        # Bound once and handed to every shape added
+        self._listener = self._shape_changed
+
+        self._grid_layer = PictureLayer()
+
+        # Every shape except the selected one is drawn through the tile
+        # cache; released shapes stay in _live until their tiles catch up
+        self.tiles = TileCache(self._tile_content)
+        self._live = []
 
         # core scene classes
         self.transform = Transform()
@@ -98,19 +193,105 @@ class Scene:
 
     def add_shape(self, shape):
         self._shapes.append(shape)
+        shape.listener = self._listener
+        self._shape_changed(shape)
 
     def remove_shape(self, shape):
         self._shapes.remove(shape)
+        shape.listener = None
+        if shape in self._live:
+            self._live.remove(shape)
+        if shape.id in self._index:
+            self.tiles.invalidate(self._index.bounds(shape.id))
+            self._index.remove(shape.id)
+
+    def add_series(self, series: Series):
+        self._series.append(series)
+
+    def remove_series(self, series: Series):
+        self._series.remove(series)
+
+    def _shape_changed(self, shape):
+        # Keep the spatial index in sync with the shape's geometry; shapes
+        # without geometry can neither be hit nor seen, so are not indexed
+        bounds = shape.bounds()
+        old_bounds = self._index.bounds(
+            shape.id) if shape.id in self._index else None
+
+        if bounds is None:
+            if old_bounds is not None:
+                self._index.remove(shape.id)
+        elif old_bounds is not None:
+            self._index.update(shape.id, bounds)
+        else:
+            self._index.insert(shape.id, shape, bounds)
+
+        # The selected shape is drawn live, outside the tiles, so moving it
+        # leaves them alone
+        if shape is not self._selected:
+            for changed in (old_bounds, bounds):
+                if changed is not None:
+                    self.tiles.invalidate(changed)
+
+    def _tile_content(self, bounds):
+        shapes = [shape for shape in self._index.query_rect(bounds)
+                  if shape is not self._selected]
+        if not shapes:
+            return None
+
+        def draw(context: ContextWrapper):
+            for shape in shapes:
+                shape.draw(context)
+
+        return draw
+
+    def _select(self, shape):
+        # Tiles are re-rendered without the selected shape, and with it
+        # again once released
+        if shape is None and self._selected is not None:
+            self._live.append(self._selected)
+        elif shape in self._live:
+            self._live.remove(shape)
+
+        changed = shape if shape is not None else self._selected
+        if changed is not None and changed.id in self._index:
+            self.tiles.invalidate(self._index.bounds(changed.id))
+
+        self._selected = shape
+
+    def _live_until_tiled(self, shape, visible_rect, scale_factor) -> bool:
+        left, top, right, bottom = self._index.bounds(shape.id)
+        if left > visible_rect[2] or visible_rect[0] > right or \
+                top > visible_rect[3] or visible_rect[1] > bottom:
+            # Off screen, leave it to the tiles
+            return False
+
+        return not self.tiles.is_current((left, top, right, bottom), scale_factor)
 
     def draw(self, context: ContextWrapper):
         context.save()
         context.concat(self.transform.matrix())
 
-        self.grid.draw(context)
+        self._grid_layer.draw(context, self.grid.content_key(),
+                              self.grid.content_bounds(), self.grid.draw)
+
+        visible_rect = self.transform.visible_rect()
+        scale_factor = self.transform.scale_factor
+        self.tiles.draw(context, visible_rect, scale_factor)
 
-        for shape in self._shapes:
+        self._live = [shape for shape in self._live
+                      if shape.id in self._index and
+                      self._live_until_tiled(shape, visible_rect, scale_factor)]
+        for shape in self._live:
             shape.draw(context)
 
+        # Series are decimated for the current zoom, so are not recorded
+        for series in self._series:
+            series.draw(context)
+
+        if self._selected is not None:
+            self._selected.draw(context)
+
         context.restore()
 
     def mouse_scroll(self, xoffset, yoffset) -> bool:
@@ -118,16 +299,20 @@ class Scene:
 
     def mouse_action(self, action: MOUSE_ACTION, pos: Vec2) -> bool:
         # Apply inverse transformation to the mouse position
-        inverse_matrix = np.linalg.inv(self.transform.matrix())
-        transformed_pos = np.dot(inverse_matrix, [pos.x, pos.y, 1.0])
-        transformed_pos = Vec2(transformed_pos[0], transformed_pos[1])
+        transformed_pos = self.transform.screen_to_world_point(pos)
 
         match action:
             case MOUSE_ACTION.LEFT_CLICK_DOWN:
                 if self._selected is None:
-                    for this_shape in self._shapes:
+                    candidates = self._index.query_point(
+                        transformed_pos.x, transformed_pos.y)
+                    for this_shape in candidates:
                         if this_shape.contains(transformed_pos):
-                            self._selected = this_shape
+                            self._select(this_shape)
+                            # Drag from where the press landed, so the
+                            # first drag event already moves the shape
+                            self._draggable = draggable(
+                                transformed_pos, this_shape)
                             return True
 
                  # Store the initial position for panning
@@ -142,15 +327,14 @@ class Scene:
 
                     return True
 
-                if self._draggable is None:
-                    self._draggable = draggable(
-                        transformed_pos, self._selected)
-                else:
+                if self._draggable is not None:
                     self._draggable.work(transformed_pos)
 
             case MOUSE_ACTION.LEFT_CLICK_UP:
+                if self._selected is not None:
+                    self._selected.commit()
                 self._draggable = None
-                self._selected = None
+                self._select(None)
 
             case MOUSE_ACTION.RIGHT_CLICK_DOWN:
                 pass
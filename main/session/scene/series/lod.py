@@ -0,0 +1,91 @@
+from __future__ import annotations
+import math
+import numpy as np
+
+
+class MinMaxPyramid:
+    """
+    Multi-resolution min/max decimation of a time series.
+
+    Level 0 is the raw series; each level above halves the number of bins
+    by merging pairs, keeping the lowest and highest sample of every bin in
+    time order. Drawing a bin's min and max is visually lossless once a bin
+    is no wider than a pixel column, so a query picks the coarsest level
+    that still has at least one bin per pixel and only slices the visible
+    bins, making it O(visible points) whatever the series length.
+    """
+
+    def __init__(self, xs: np.ndarray, ys: np.ndarray) -> None:
+        xs = np.ascontiguousarray(xs, dtype=np.float64)
+        ys = np.ascontiguousarray(ys, dtype=np.float64)
+        if len(xs) != len(ys):
+            raise ValueError('xs and ys must be the same length')
+
+        # Per level: (bin start x, min x, min y, max x, max y)
+        self._levels = [(xs, xs, ys, xs, ys)]
+
+        while len(self._levels[-1][0]) > 1:
+            self._levels.append(self._merge(*self._levels[-1]))
+
+    @staticmethod
+    def _merge(starts, min_xs, min_ys, max_xs, max_ys) -> tuple:
+        if len(starts) % 2:
+            # Pad with a copy of the last bin, merging it with itself is a
+            # no-op
+            starts, min_xs, min_ys, max_xs, max_ys = (
+                np.append(a, a[-1]) for a in (starts, min_xs, min_ys, max_xs, max_ys))
+
+        left_min = min_ys[0::2] <= min_ys[1::2]
+        left_max = max_ys[0::2] >= max_ys[1::2]
+
+        return (starts[0::2],
+                np.where(left_min, min_xs[0::2], min_xs[1::2]),
+                np.where(left_min, min_ys[0::2], min_ys[1::2]),
+                np.where(left_max, max_xs[0::2], max_xs[1::2]),
+                np.where(left_max, max_ys[0::2], max_ys[1::2]))
+
+    def __len__(self) -> int:
+        return len(self._levels[0][0])
+
+    @property
+    def num_levels(self) -> int:
+        return len(self._levels)
+
+    def level_for(self, x0: float, x1: float, columns: float) -> int:
+        """
+        Coarsest level that still has a bin per pixel column when x0..x1 is
+        spread over columns pixels
+        """
+        starts = self._levels[0][0]
+        count = np.searchsorted(starts, x1, 'right') - \
+            np.searchsorted(starts, x0, 'left')
+        if count <= columns or columns <= 0:
+            return 0
+
+        return min(math.floor(math.log2(count / columns)), self.num_levels - 1)
+
+    def query(self, x0: float, x1: float, columns: float) -> tuple[int, int, int, np.ndarray, np.ndarray]:
+        """
+        Decimated polyline covering x0..x1, returned as (level, first bin,
+        last bin, xs, ys). One bin either side of the range is included so
+        the line runs off screen rather than stopping short.
+        """
+        level = self.level_for(x0, x1, columns)
+        starts, min_xs, min_ys, max_xs, max_ys = self._levels[level]
+
+        first = max(int(np.searchsorted(starts, x0, 'right')) - 2, 0)
+        last = min(int(np.searchsorted(starts, x1, 'right')) + 1, len(starts))
+
+        if level == 0:
+            return level, first, last, min_xs[first:last], min_ys[first:last]
+
+        # Emit each bin's min and max in the order they occur
+        min_first = min_xs[first:last] <= max_xs[first:last]
+        xs = np.empty((last - first) * 2)
+        ys = np.empty((last - first) * 2)
+        xs[0::2] = np.where(min_first, min_xs[first:last], max_xs[first:last])
+        ys[0::2] = np.where(min_first, min_ys[first:last], max_ys[first:last])
+        xs[1::2] = np.where(min_first, max_xs[first:last], min_xs[first:last])
+        ys[1::2] = np.where(min_first, max_ys[first:last], min_ys[first:last])
+
+        return level, first, last, xs, ys
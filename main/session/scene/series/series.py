@@ -0,0 +1,60 @@
+from __future__ import annotations
+from typing import Protocol
+import numpy as np
+from shared_crypto_analysis.shared_python.shared_math.geometry import BezierPathA
+from ....array_geometry import ArrayContour, ArrayPath
+from ....context_wrapper import ContextWrapper, path_provider
+from ....helpers import Color, next_id
+from .lod import MinMaxPyramid
+
+
+class TransformProvider(Protocol):
+    @property
+    def width(self) -> float:
+        ...
+
+    @property
+    def scale_factor(self) -> float:
+        ...
+
+    def visible_rect(self) -> tuple[float, float, float, float]:
+        ...
+
+
+class Series:
+    """
+    A line series drawn through a MinMaxPyramid, so only about two vertices
+    per visible pixel column reach the path whatever the series length.
+    xs must be sorted ascending.
+    """
+
+    def __init__(self, xs: np.ndarray, ys: np.ndarray, transform_provider: TransformProvider,
+                 color: Color, thickness: float = 1.0) -> None:
+        self.id = next_id()
+        self._transform = transform_provider
+        self._pyramid = MinMaxPyramid(xs, ys)
+
+        # Stroke width in screen pixels
+        self.thickness = thickness
+        self._context_path = path_provider()(None, color, None, thickness)
+        self._query_key = None
+
+    def draw(self, context: ContextWrapper) -> None:
+        left, _, right, _ = self._transform.visible_rect()
+        level, first, last, xs, ys = self._pyramid.query(
+            left, right, self._transform.width)
+
+        # Only rebuild the path when the decimated slice changes
+        key = (level, first, last)
+        if key != self._query_key:
+            path = ArrayPath()
+            path.add_contour(ArrayContour.from_polyline(xs, ys))
+
+            patha = BezierPathA()
+            patha.paths.append(path)
+            self._context_path.set_path(patha)
+            self._query_key = key
+
+        self._context_path.stroke_thickness = \
+            self.thickness / self._transform.scale_factor
+        context.draw_path(self._context_path)
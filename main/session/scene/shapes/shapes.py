@@ -1,44 +1,160 @@
 from __future__ import annotations
-import uuid
 import math
+import numpy as np
 from ....context_wrapper import ContextWrapper, path_provider
-from ....helpers import Color
+from ....helpers import Color, next_id
+from ....array_geometry import ArrayContour, ArrayPath
 from shared_crypto_analysis.shared_python.shared_math.geometry import Vec2, BezierPathA, BezierPath, BezierContour, BezierPoint
 
 
 class Shape:
+    # Scenes hold many shapes, so no per instance __dict__; color is set by
+    # the construct_* factories
+    __slots__ = ('id', '_path', 'stroke', 'stroke_thickness', 'fill', 'color',
+                 'context_path', '_offset', '_geometry_bounds', 'listener')
+
     def __init__(self):
-        self.id = uuid.uuid4()
+        self.id = next_id()
         self._path = BezierPathA()
         self.stroke = Color(0, 0, 255)
         self.stroke_thickness = 3.0
         self.fill = Color(255, 0, 0)
         self.context_path = path_provider()(
-            self.path, self.stroke, self.fill, self.stroke_thickness)
+            self._path, self.stroke, self.fill, self.stroke_thickness)
+
+        # Translation not yet folded into the geometry, see commit()
+        self._offset = Vec2(0.0, 0.0)
+
+        # (tight, conservative) bounds of the geometry without the offset,
+        # None until first asked for after a path change
+        self._geometry_bounds = None
+
+        # Called with the shape whenever its geometry changes; set by the
+        # scene holding it, which shares one callback between all its shapes
+        self.listener = None
 
     @property
     def path(self) -> BezierPathA:
+        self.commit()
         return self._path
 
     @path.setter
     def path(self, path: BezierPathA) -> None:
         self._path = path
+        self._offset = Vec2(0.0, 0.0)
+        self._geometry_bounds = None
         self.context_path.set_path(path)
+        self._changed()
+
+    @property
+    def offset(self) -> Vec2:
+        return self._offset
+
+    def commit(self) -> None:
+        """
+        Folds the pending offset into the bezier model and skia paths
+        """
+        offset = self._offset
+        if offset.x == 0.0 and offset.y == 0.0:
+            return
+
+        self._offset = Vec2(0.0, 0.0)
+        self._path.translate(offset)
+        self.context_path.translate(offset)
+
+        if self._geometry_bounds is not None:
+            self._geometry_bounds = tuple(
+                None if b is None else
+                (b[0] + offset.x, b[1] + offset.y, b[2] + offset.x, b[3] + offset.y)
+                for b in self._geometry_bounds)
+
+    def _cached_bounds(self) -> tuple:
+        if self._geometry_bounds is None:
+            self._geometry_bounds = (self.context_path.tight_bounds(),
+                                     self.context_path.bounds())
+
+        return self._geometry_bounds
+
+    def tight_bounds(self) -> tuple[float, float, float, float] | None:
+        """
+        World space bounds of the filled geometry, fitted to the curves
+        """
+        ret = self._cached_bounds()[0]
+        if ret is None:
+            return None
+
+        x, y = self._offset.x, self._offset.y
+        return (ret[0] + x, ret[1] + y, ret[2] + x, ret[3] + y)
+
+    def bounds(self) -> tuple[float, float, float, float] | None:
+        """
+        Conservative world space bounds, including curve control points and
+        half the stroke width
+        """
+        ret = self._cached_bounds()[1]
+        if ret is None:
+            return None
+
+        pad = self.stroke_thickness / 2
+        x, y = self._offset.x, self._offset.y
+        return (ret[0] - pad + x, ret[1] - pad + y, ret[2] + pad + x, ret[3] + pad + y)
 
     def contains(self, pos: Vec2) -> bool:
+        x = pos.x - self._offset.x
+        y = pos.y - self._offset.y
+
+        tight = self._cached_bounds()[0]
+        if tight is None or not (tight[0] <= x <= tight[2] and tight[1] <= y <= tight[3]):
+            return False
+
         for path in self.context_path.path:
-            if path.contains(pos.x, pos.y):
+            if path.contains(x, y):
                 return True
 
         return False
 
+    def contains_many(self, points: np.ndarray) -> np.ndarray:
+        """
+        contains for an (N, 2) array of points, as an (N,) bool array.
+        Curves are flattened for the test, so points within a fraction of
+        a unit of the outline may differ from contains.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2) - \
+            (self._offset.x, self._offset.y)
+
+        ret = np.zeros(len(points), dtype=bool)
+        tight = self._cached_bounds()[0]
+        if tight is None:
+            return ret
+
+        inside = (points[:, 0] >= tight[0]) & (points[:, 0] <= tight[2]) & \
+            (points[:, 1] >= tight[1]) & (points[:, 1] <= tight[3])
+        if inside.any():
+            ret[inside] = self.context_path.contains_points(points[inside])
+
+        return ret
+
     def translate(self, pos: Vec2):
-        self.path.translate(pos)
-        self.context_path.translate(pos)
+        # Only moves the offset; the geometry catches up on commit()
+        self._offset = self._offset + pos
+        self._changed()
+
+    def _changed(self) -> None:
+        if self.listener is not None:
+            self.listener(self)
 
     def draw(self, context: ContextWrapper):
         context.set_color(self.color)
+
+        offset = self._offset
+        if offset.x == 0.0 and offset.y == 0.0:
+            context.draw_path(self.context_path)
+            return
+
+        context.save()
+        context.translate(offset)
         context.draw_path(self.context_path)
+        context.restore()
 
     @classmethod
     def construct_polygon(cls, origin: Vec2, radius: float, sides: int, color: Color) -> Shape:
@@ -63,6 +179,27 @@ class Shape:
 
         return ret
 
+    @classmethod
+    def construct_polyline(cls, xs: np.ndarray, ys: np.ndarray, color: Color, closed: bool = False) -> Shape:
+        """
+        Array backed shape for long series; only stroked unless closed
+        """
+        ret = Shape()
+        ret.color = color
+
+        path = ArrayPath()
+        path.add_contour(ArrayContour.from_polyline(xs, ys, closed))
+
+        if not closed:
+            ret.fill = None
+            ret.context_path.fill_color = None
+
+        patha = BezierPathA()
+        patha.paths.append(path)
+        ret.path = patha
+
+        return ret
+
     @classmethod
     def construct_circle(cls, center: Vec2, radius: float, color: Color) -> Shape:
         """
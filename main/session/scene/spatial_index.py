@@ -0,0 +1,135 @@
+from __future__ import annotations
+import math
+from typing import Hashable, Iterator
+
+# (left, top, right, bottom) in world coordinates
+Bounds = tuple[float, float, float, float]
+
+
+class SpatialGrid:
+    """
+    Uniform grid over world space, mapping each cell to the items whose
+    bounds overlap it.
+
+    Queries return items in insertion order so callers that care about
+    z-order (picking, drawing) see the same order as a linear scan.
+    """
+
+    def __init__(self, cell_size: float = 256.0) -> None:
+        self._cell_size = cell_size
+        self._cells: dict[tuple[int, int], set[Hashable]] = {}
+        self._items: dict[Hashable, tuple[object, Bounds, int]] = {}
+        self._next_order = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def bounds(self, key: Hashable) -> Bounds:
+        return self._items[key][1]
+
+    def _cell_span(self, bounds: Bounds) -> tuple[int, int, int, int]:
+        """
+        (min x, min y, max x, max y) of the cells bounds overlaps
+        """
+        left, top, right, bottom = bounds
+        return (math.floor(left / self._cell_size),
+                math.floor(top / self._cell_size),
+                math.floor(right / self._cell_size),
+                math.floor(bottom / self._cell_size))
+
+    def _cell_range(self, bounds: Bounds) -> Iterator[tuple[int, int]]:
+        min_x, min_y, max_x, max_y = self._cell_span(bounds)
+
+        for cx in range(min_x, max_x + 1):
+            for cy in range(min_y, max_y + 1):
+                yield (cx, cy)
+
+    def insert(self, key: Hashable, item: object, bounds: Bounds) -> None:
+        if key in self._items:
+            self.remove(key)
+
+        self._items[key] = (item, bounds, self._next_order)
+        self._next_order += 1
+
+        for cell in self._cell_range(bounds):
+            self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key: Hashable) -> None:
+        _, bounds, _ = self._items.pop(key)
+
+        for cell in self._cell_range(bounds):
+            keys = self._cells[cell]
+            keys.discard(key)
+            if not keys:
+                del self._cells[cell]
+
+    def update(self, key: Hashable, bounds: Bounds) -> None:
+        item, old_bounds, order = self._items[key]
+        if old_bounds == bounds:
+            return
+
+        # Most drag steps stay within the same cells
+        self._items[key] = (item, bounds, order)
+        if self._cell_span(old_bounds) == self._cell_span(bounds):
+            return
+
+        old_cells = set(self._cell_range(old_bounds))
+        new_cells = set(self._cell_range(bounds))
+
+        for cell in old_cells - new_cells:
+            keys = self._cells[cell]
+            keys.discard(key)
+            if not keys:
+                del self._cells[cell]
+
+        for cell in new_cells - old_cells:
+            self._cells.setdefault(cell, set()).add(key)
+
+    def _sorted(self, keys: set[Hashable]) -> list:
+        entries = [self._items[key] for key in keys]
+        entries.sort(key=lambda entry: entry[2])
+        return [entry[0] for entry in entries]
+
+    def query_point(self, x: float, y: float) -> list:
+        """
+        Items whose bounds contain (x, y), in insertion order.
+        """
+        cell = (math.floor(x / self._cell_size),
+                math.floor(y / self._cell_size))
+
+        hits = set()
+        for key in self._cells.get(cell, ()):
+            left, top, right, bottom = self._items[key][1]
+            if left <= x <= right and top <= y <= bottom:
+                hits.add(key)
+
+        return self._sorted(hits)
+
+    def query_rect(self, bounds: Bounds) -> list:
+        """
+        Items whose bounds intersect bounds, in insertion order.
+        """
+        left, top, right, bottom = bounds
+
+        # A huge query rect (zoomed far out) touches more cells than there
+        # are items, so fall back to filtering the items directly
+        num_cells = ((right - left) / self._cell_size + 1) * \
+            ((bottom - top) / self._cell_size + 1)
+        if num_cells > len(self._cells):
+            candidates = self._items.keys()
+        else:
+            candidates = set()
+            for cell in self._cell_range(bounds):
+                candidates.update(self._cells.get(cell, ()))
+
+        hits = set()
+        for key in candidates:
+            item_left, item_top, item_right, item_bottom = self._items[key][1]
+            if item_left <= right and left <= item_right and \
+                    item_top <= bottom and top <= item_bottom:
+                hits.add(key)
+
+        return self._sorted(hits)
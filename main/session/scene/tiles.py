@@ -0,0 +1,297 @@
+from __future__ import annotations
+import math
+import time
+from collections import OrderedDict
+from typing import Callable
+import numpy as np
+from ...context_wrapper import ContextWrapper
+from ...logic_helpers.property import _Event
+from ...profiling import profiler
+from .spatial_index import Bounds
+
+# (zoom bucket, tile x, tile y)
+TileKey = tuple[int, int, int]
+
+# content(bounds) returns the function that draws the world content inside
+# bounds, or None if there is nothing there
+TileContent = Callable[[Bounds], Callable[[ContextWrapper], None] | None]
+
+
+class _Tile:
+    __slots__ = ('image', 'preview', 'current')
+
+    def __init__(self) -> None:
+        self.image = None
+        self.preview = None
+        self.current = False
+
+
+class TileCache:
+    """
+    Raster cache of world content split into fixed size tiles.
+
+    Tiles are rendered at the scale of their zoom bucket, a quarter octave
+    of Transform.scale_factor wide. Until the sharp tile arrives a low
+    resolution preview, or part of a tile from a coarser bucket, stands in
+    for it. An invalidated tile keeps drawing its old image until the new
+    one is ready.
+
+    Tiles are rendered on the main thread while drawing, previews first,
+    until frame_budget seconds have been spent; the rest wait for the next
+    frame. skia-python holds the GIL while drawing, so worker threads would
+    only take turns with the main thread. At least one tile is rendered
+    per frame, so a tile costing more than the budget still stalls that
+    frame for as long as it takes. With frame_budget=None every missing
+    tile is rendered before drawing. Tiles with no content are not
+    rasterized, only remembered as empty.
+
+    tile_ready is notified with the number of tiles left after a frame
+    that could not render them all, so the window can schedule another.
+    """
+
+    TILE_SIZE = 256
+    PREVIEW_SIZE = 64
+    BUCKETS_PER_OCTAVE = 4
+    # How many coarser buckets are searched for a placeholder
+    PLACEHOLDER_DEPTH = 12
+    # Empty tiles hold no image, so are kept to a count as well as bytes
+    MAX_TILES = 4096
+
+    def __init__(self, content: TileContent, frame_budget: float = 0.008,
+                 budget_bytes: int = 256 * 1024 * 1024) -> None:
+        self.frame_budget = frame_budget
+        self.budget_bytes = budget_bytes
+        self.tile_ready = _Event()
+
+        self._content = content
+        # Only tiles that were rendered are kept, and every one is counted
+        # against budget_bytes or MAX_TILES
+        self._tiles: OrderedDict[TileKey, _Tile] = OrderedDict()
+        # Cached keys per zoom bucket, for invalidation
+        self._buckets: dict[int, set[TileKey]] = {}
+        self._bytes = 0
+
+    @classmethod
+    def bucket(cls, scale_factor: float) -> int:
+        return round(math.log2(scale_factor) * cls.BUCKETS_PER_OCTAVE)
+
+    @classmethod
+    def bucket_scale(cls, bucket: int) -> float:
+        return 2.0 ** (bucket / cls.BUCKETS_PER_OCTAVE)
+
+    @classmethod
+    def tile_bounds(cls, key: TileKey) -> Bounds:
+        bucket, tx, ty = key
+        size = cls.TILE_SIZE / cls.bucket_scale(bucket)
+        return (tx * size, ty * size, (tx + 1) * size, (ty + 1) * size)
+
+    @classmethod
+    def _ranges(cls, bucket: int, bounds: Bounds) -> tuple[range, range]:
+        size = cls.TILE_SIZE / cls.bucket_scale(bucket)
+        left, top, right, bottom = bounds
+
+        return (range(math.floor(left / size), math.floor(right / size) + 1),
+                range(math.floor(top / size), math.floor(bottom / size) + 1))
+
+    @classmethod
+    def _keys(cls, bucket: int, bounds: Bounds) -> list[TileKey]:
+        xs, ys = cls._ranges(bucket, bounds)
+        return [(bucket, tx, ty) for ty in ys for tx in xs]
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._bytes
+
+    def invalidate(self, bounds: Bounds = None) -> None:
+        """
+        Marks every cached tile overlapping bounds, or all tiles, for
+        re-rendering
+        """
+        for bucket, keys in self._buckets.items():
+            if bounds is None:
+                affected = keys
+            else:
+                xs, ys = self._ranges(bucket, bounds)
+                if len(xs) * len(ys) <= len(keys):
+                    affected = [(bucket, tx, ty) for ty in ys for tx in xs]
+                else:
+                    # Bounds cover more tiles than this bucket has cached
+                    affected = [key for key in keys
+                                if key[1] in xs and key[2] in ys]
+
+            for key in affected:
+                tile = self._tiles.get(key)
+                if tile is not None:
+                    tile.current = False
+
+    def is_current(self, bounds: Bounds, scale_factor: float) -> bool:
+        """
+        Whether every tile over bounds at this zoom has an up to date image
+        """
+        for key in self._keys(self.bucket(scale_factor), bounds):
+            tile = self._tiles.get(key)
+            if tile is None or not tile.current:
+                return False
+
+        return True
+
+    @staticmethod
+    def _image_bytes(image) -> int:
+        return 0 if image is None else image.width() * image.height() * 4
+
+    def _evict(self) -> None:
+        while self._tiles and (self._bytes > self.budget_bytes or
+                               len(self._tiles) > self.MAX_TILES):
+            key, tile = self._tiles.popitem(last=False)
+            self._bytes -= self._image_bytes(tile.image) + \
+                self._image_bytes(tile.preview)
+
+            keys = self._buckets[key[0]]
+            keys.discard(key)
+            if not keys:
+                del self._buckets[key[0]]
+
+    def _rasterize(self, context: ContextWrapper, key: TileKey, pixels: int,
+                   draw: Callable[[ContextWrapper], None]):
+        left, top, _, _ = self.tile_bounds(key)
+        scale = self.bucket_scale(key[0]) * pixels / self.TILE_SIZE
+        matrix = np.array([
+            [scale, 0.0, -left * scale],
+            [0.0, scale, -top * scale],
+            [0.0, 0.0, 1.0]
+        ])
+
+        def draw_tile(tile_context: ContextWrapper) -> None:
+            tile_context.concat(matrix)
+            draw(tile_context)
+
+        return context.rasterize(pixels, pixels, draw_tile)
+
+    def _publish(self, key: TileKey, image, preview: bool) -> None:
+        """
+        Stores a rendered image; a sharp image of None marks the tile empty
+        """
+        tile = self._tiles.get(key)
+        if tile is None:
+            tile = _Tile()
+            self._tiles[key] = tile
+            self._buckets.setdefault(key[0], set()).add(key)
+
+        if preview:
+            self._bytes += self._image_bytes(image) - \
+                self._image_bytes(tile.preview)
+            tile.preview = image
+        else:
+            self._bytes += self._image_bytes(image) - \
+                self._image_bytes(tile.image)
+            tile.image = image
+            tile.current = True
+            if image is None:
+                self._bytes -= self._image_bytes(tile.preview)
+                tile.preview = None
+        self._evict()
+
+    def _render(self, context: ContextWrapper, key: TileKey, preview: bool) -> None:
+        draw = self._content(self.tile_bounds(key))
+        if draw is None:
+            self._publish(key, None, False)
+            return
+
+        if preview:
+            with profiler.span('TileCache.preview'):
+                image = self._rasterize(context, key, self.PREVIEW_SIZE, draw)
+        else:
+            with profiler.span('TileCache.tile'):
+                image = self._rasterize(context, key, self.TILE_SIZE, draw)
+
+        self._publish(key, image, preview)
+
+    def _draw_placeholder(self, context: ContextWrapper, key: TileKey) -> None:
+        """
+        Draws the overlapping part of the nearest coarser cached tile
+        """
+        left, top, right, bottom = self.tile_bounds(key)
+        center = ((left + right) / 2, (top + bottom) / 2)
+
+        for bucket in range(key[0] - 1, key[0] - self.PLACEHOLDER_DEPTH - 1, -1):
+            size = self.TILE_SIZE / self.bucket_scale(bucket)
+            coarse_key = (bucket, math.floor(center[0] / size),
+                          math.floor(center[1] / size))
+
+            coarse = self._tiles.get(coarse_key)
+            image = None if coarse is None else coarse.image or coarse.preview
+            if image is None:
+                continue
+
+            coarse_left, coarse_top, _, _ = self.tile_bounds(coarse_key)
+            dst = (max(left, coarse_left), max(top, coarse_top),
+                   min(right, coarse_left + size), min(bottom, coarse_top + size))
+            pixels = image.width() / size
+            src = ((dst[0] - coarse_left) * pixels, (dst[1] - coarse_top) * pixels,
+                   (dst[2] - coarse_left) * pixels, (dst[3] - coarse_top) * pixels)
+
+            context.draw_image(image, src, dst)
+            return
+
+    def draw(self, context: ContextWrapper, visible_rect: Bounds, scale_factor: float) -> None:
+        """
+        Renders what the frame budget allows of the tiles covering
+        visible_rect that are missing or out of date, then draws them in
+        world coordinates
+        """
+        keys = self._keys(self.bucket(scale_factor), visible_rect)
+
+        # Previews of empty tiles first, so the screen fills quickly, then
+        # their sharp images, then stale tiles
+        previews, missing, stale = [], [], []
+        for key in keys:
+            tile = self._tiles.get(key)
+            if tile is None:
+                previews.append((key, True))
+                missing.append((key, False))
+            else:
+                self._tiles.move_to_end(key)
+                if tile.current:
+                    continue
+                if tile.image is None:
+                    missing.append((key, False))
+                else:
+                    stale.append((key, False))
+
+        jobs = previews + missing + stale
+        if self.frame_budget is None:
+            # Sharp images only, the previews would never be seen
+            jobs = missing + stale
+
+        deadline = time.perf_counter() + (self.frame_budget or 0.0)
+        done = 0
+        for key, preview in jobs:
+            if done and self.frame_budget is not None and \
+                    time.perf_counter() >= deadline:
+                break
+            tile = self._tiles.get(key)
+            if tile is not None and tile.current:
+                # Found empty while rendering its preview
+                continue
+            self._render(context, key, preview)
+            done += 1
+
+        for key in keys:
+            tile = self._tiles.get(key)
+            image, pixels = None, self.TILE_SIZE
+            if tile is not None:
+                if tile.current and tile.image is None:
+                    # Empty
+                    continue
+                image = tile.image
+                if image is None and tile.preview is not None:
+                    image, pixels = tile.preview, self.PREVIEW_SIZE
+
+            if image is not None:
+                context.draw_image(image, (0, 0, pixels, pixels),
+                                   self.tile_bounds(key))
+            else:
+                self._draw_placeholder(context, key)
+
+        if done < len(jobs):
+            self.tile_ready.notify(len(jobs) - done)
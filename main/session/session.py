@@ -1,6 +1,7 @@
 from .scene.scene import Scene
 from ..context_wrapper import ContextWrapper
 from ..helpers import MOUSE_ACTION
+from ..profiling import profiler
 from shared_crypto_analysis.shared_python.shared_math.geometry import Vec2
 from .properties import SessionProperties, TIME_INTERVAL
 
@@ -24,8 +25,15 @@ class Session:
     def remove_shape(self, shape):
         self.scene.remove_shape(shape)
 
+    def add_series(self, series):
+        self.scene.add_series(series)
+
+    def remove_series(self, series):
+        self.scene.remove_series(series)
+
     def draw(self, context: ContextWrapper):
-        self.scene.draw(context)
+        with profiler.span('Scene.draw'):
+            self.scene.draw(context)
 
     def mouse_scroll(self, xoffset, yoffset) -> bool:
         return self.scene.mouse_scroll(xoffset, yoffset)
@@ -4,6 +4,8 @@ from ..helpers import Color
 
 
 class Button:
+    __slots__ = ('pos', 'width', 'height', 'color', 'clicked', 'selected')
+
     def __init__(self, id: str, width: float, height: float, color: Color):
         self.pos = None
         self.width = width
@@ -21,14 +23,16 @@ class Button:
             self.pos.y <= pos.y <= self.pos.y + self.height
         )
 
-    def draw(self, context: ContextWrapper):
+    def current_color(self) -> Color:
         if self.selected:
-            context.set_color(Color(255, 0, 255))
+            return Color(255, 0, 255)
         elif self.clicked:
-            context.set_color(Color(77, 77, 77))
-        else:
-            context.set_color(self.color)
+            return Color(77, 77, 77)
 
+        return self.color
+
+    def draw(self, context: ContextWrapper):
+        context.set_color(self.current_color())
         context.draw_rect(self.pos.x, self.pos.y, self.width, self.height)
 
     def click(self):
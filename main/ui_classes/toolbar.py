@@ -1,3 +1,4 @@
+import numpy as np
 from shared_crypto_analysis.shared_python.shared_math.geometry import Vec2
 from ..context_wrapper import ContextWrapper
 from .button import Button
@@ -29,11 +30,15 @@ class Toolbar:
             btn.set_pos(Vec2(x, y))
 
     def draw(self, context: ContextWrapper):
-        context.set_color(self.bg_color)
-        context.draw_rect(self.pos.x, self.pos.y, self.width, self.height)
-
-        for btn in self.buttons:
-            btn.draw(context)
+        # Background and buttons go out as a single batch, background first
+        rects = np.array(
+            [(self.pos.x, self.pos.y, self.width, self.height)] +
+            [(btn.pos.x, btn.pos.y, btn.width, btn.height) for btn in self.buttons])
+        colors = np.array(
+            [self.bg_color.argb] +
+            [btn.current_color().argb for btn in self.buttons], dtype=np.uint32)
+
+        context.draw_rects(rects, colors)
 
     def hit_test(self, pos: Vec2):
         for btn in self.buttons:
@@ -10,6 +10,9 @@ from .ui_classes.button import Button
 from .ui_classes.toolbar import Toolbar
 from .helpers import MOUSE_ACTION, Color
 from .session.session import Session
+from .frame_scheduler import FrameScheduler
+from .input_queue import InputQueue
+from .profiling import profiler
 
 
 class _DrawArea:
@@ -24,14 +27,33 @@ class _DrawArea:
 
         self.mouse_pos = Vec2(0.0, 0.0)
 
+        # Scene input is queued by the callbacks and applied once per frame
+        self.input = InputQueue()
+
+        self.scheduler = FrameScheduler()
+        self.session.properties.grid_width_register_callback(
+            self.scheduler.mark_dirty)
+        self.session.properties.interval_register_callback(
+            self.scheduler.mark_dirty)
+        # Set while drawing when tiles are left over from the frame budget;
+        # the loop draws again for them once the frame is done
+        self.tiles_pending = False
+        self.session.scene.tiles.tile_ready.register(self._tile_ready)
+
+    def _tile_ready(self, remaining):
+        self.tiles_pending = True
+
     def add_shape(self, shape):
         self.session.add_shape(shape)
+        self.scheduler.mark_dirty()
 
     def remove_shape(self, shape):
         self.session.remove_shape(shape)
+        self.scheduler.mark_dirty()
 
     def draw(self, context: ContextWrapper):
         # Render contents of the draw area
+        self.tiles_pending = False
         context.save()
         self.session.draw(context)
         context.restore()
@@ -39,55 +61,86 @@ class _DrawArea:
         # Render UI
         self.toolbar.draw(context)
 
+        if profiler.hud:
+            profiler.draw_hud(context, self.width - 248, 40, 240, 60)
+
+    def flush_input(self) -> None:
+        with profiler.span('input.flush'):
+            self.input.flush(self.session.mouse_action,
+                             self.session.mouse_scroll)
+
     def mouse_button_callback(self, window, button, action, mods):
-        x, y = glfw.get_cursor_pos(window)
-        pos = Vec2(x, y)
-
-        if button == glfw.MOUSE_BUTTON_LEFT:
-            if action == glfw.PRESS:
-                clicked_button = self.toolbar.hit_test(pos)
-                if clicked_button:
-                    clicked_button.click()
-                else:
-                    self.session.mouse_action(
-                        MOUSE_ACTION.LEFT_CLICK_DOWN, pos)
-
-            elif action == glfw.RELEASE:
-                self.session.mouse_action(MOUSE_ACTION.LEFT_CLICK_UP, pos)
-
-        if button == glfw.MOUSE_BUTTON_RIGHT:
-            if action == glfw.PRESS:
-                self.session.mouse_action(
-                    MOUSE_ACTION.RIGHT_CLICK_DOWN, pos)
-
-            if action == glfw.RELEASE:
-                self.session.mouse_action(
-                    MOUSE_ACTION.RIGHT_CLICK_UP, pos)
+        with profiler.span('input.mouse_button'):
+            x, y = glfw.get_cursor_pos(window)
+            self.scheduler.mark_dirty()
+
+            if button == glfw.MOUSE_BUTTON_LEFT:
+                if action == glfw.PRESS:
+                    clicked_button = self.toolbar.hit_test(Vec2(x, y))
+                    if clicked_button:
+                        clicked_button.click()
+                    else:
+                        self.input.push_action(
+                            MOUSE_ACTION.LEFT_CLICK_DOWN, x, y)
+
+                elif action == glfw.RELEASE:
+                    self.input.push_action(MOUSE_ACTION.LEFT_CLICK_UP, x, y)
+
+            if button == glfw.MOUSE_BUTTON_RIGHT:
+                if action == glfw.PRESS:
+                    self.input.push_action(
+                        MOUSE_ACTION.RIGHT_CLICK_DOWN, x, y)
+
+                if action == glfw.RELEASE:
+                    self.input.push_action(
+                        MOUSE_ACTION.RIGHT_CLICK_UP, x, y)
 
     def scroll_callback(self, window, xoffset, yoffset):
-        self.session.mouse_scroll(xoffset, yoffset)
+        with profiler.span('input.scroll'):
+            self.input.push_scroll(xoffset, yoffset)
+            self.scheduler.mark_dirty()
 
     def cursor_pos_callback(self, window, xpos, ypos):
-        self.mouse_pos.x = xpos
-        self.mouse_pos.y = ypos
+        with profiler.span('input.cursor_pos'):
+            self.mouse_pos.x = xpos
+            self.mouse_pos.y = ypos
 
-        if glfw.get_mouse_button(window, glfw.MOUSE_BUTTON_LEFT) == glfw.PRESS:
-            pos = Vec2(xpos, ypos)
-            self.session.mouse_action(MOUSE_ACTION.LEFT_CLICK_DRAG, pos)
+            if glfw.get_mouse_button(window, glfw.MOUSE_BUTTON_LEFT) == glfw.PRESS:
+                self.input.push_action(
+                    MOUSE_ACTION.LEFT_CLICK_DRAG, xpos, ypos)
+                self.scheduler.mark_dirty()
 
     def window_size_callback(self, window, width, height):
-        self.width = width
-        self.height = height
-        self.session.scene.transform.width = width
-        self.session.scene.transform.height = height
+        with profiler.span('input.window_size'):
+            self.width = width
+            self.height = height
+            self.session.scene.transform.width = width
+            self.session.scene.transform.height = height
+            self.scheduler.mark_dirty()
 
 
 class Wmain:
-    def __init__(self, width: int, height: int):
+    def __init__(self, width: int, height: int, profile_trace: str = None):
         self.width = width
         self.height = height
         self.draw_area = _DrawArea(width, height)
 
+        # When set, frames are profiled, the HUD is shown and the trace is
+        # written to this path when the window closes
+        self.profile_trace = profile_trace
+        if profile_trace:
+            profiler.enabled = True
+            profiler.hud = True
+
+        # GPU state, kept alive for the lifetime of the window
+        self._surface = None
+        self._context_wrapper = None
+        self._framebuffer_changed = True
+
+    def window_size_callback(self, window, width, height):
+        self._framebuffer_changed = True
+        self.draw_area.window_size_callback(window, width, height)
+
     def run(self):
         with self.glfw_window(self.width, self.height) as window:
             glfw.set_mouse_button_callback(
@@ -97,27 +150,65 @@ class Wmain:
             glfw.set_scroll_callback(
                 window, self.draw_area.scroll_callback)
             glfw.set_window_size_callback(
-                window, self.draw_area.window_size_callback)
+                window, self.window_size_callback)
+            glfw.set_window_refresh_callback(
+                window, self.draw_area.scheduler.mark_dirty)
 
             width, height = glfw.get_window_size(window)
-            self.draw_area.window_size_callback(window, width, height)
-
-            while not glfw.window_should_close(window):
-                GL.glClear(GL.GL_COLOR_BUFFER_BIT)
-
-                with self.skia_surface(window) as surface:
-                    with surface as canvas:
-                        self.draw_area.draw(ContextWrapperSkia(canvas))
-
-                    surface.flushAndSubmit()
-                    glfw.swap_buffers(window)
-
-                glfw.poll_events()
+            self.window_size_callback(window, width, height)
+
+            scheduler = self.draw_area.scheduler
+
+            with self.skia_context() as context:
+                while not glfw.window_should_close(window):
+                    if scheduler.should_draw():
+                        profiler.begin_frame()
+
+                        self.draw_area.flush_input()
+
+                        surface = self._get_surface(context, window)
+                        # Clear through skia rather than GL so the context's
+                        # cached GL state stays valid across frames
+                        surface.getCanvas().clear(skia.ColorBLACK)
+                        self.draw_area.draw(self._context_wrapper)
+
+                        with profiler.span('flushAndSubmit'):
+                            surface.flushAndSubmit()
+                        glfw.swap_buffers(window)
+                        scheduler.frame_drawn()
+
+                        profiler.end_frame()
+                        if profiler.hud or self.draw_area.tiles_pending:
+                            # Keep the HUD updating while otherwise idle,
+                            # and finish the tiles left from this frame
+                            scheduler.mark_dirty()
+
+                    timeout = scheduler.timeout()
+                    if timeout > 0.0:
+                        glfw.wait_events_timeout(timeout)
+                    else:
+                        glfw.poll_events()
+
+                self._surface = None
+                self._context_wrapper = None
+
+        if self.profile_trace:
+            profiler.export_trace(self.profile_trace)
+
+    def _get_surface(self, context: GrDirectContext, window) -> skia.Surface:
+        # The surface only wraps the default framebuffer, so it has to be
+        # rebuilt when the framebuffer is resized; everything else, including
+        # the GPU caches owned by the context, is reused between frames
+        if self._surface is None or self._framebuffer_changed:
+            self._surface = self.skia_surface(context, window)
+            self._context_wrapper = ContextWrapperSkia(
+                self._surface.getCanvas())
+            self._framebuffer_changed = False
+
+        return self._surface
 
     @staticmethod
-    @contextlib.contextmanager
-    def skia_surface(window):
-        context = GrDirectContext.MakeGL()
+    def skia_surface(context: GrDirectContext, window) -> skia.Surface:
         (fb_width, fb_height) = glfw.get_framebuffer_size(window)
         backend_render_target = GrBackendRenderTarget(
             fb_width,
@@ -129,8 +220,17 @@ class Wmain:
             context, backend_render_target, kBottomLeft_GrSurfaceOrigin,
             kRGBA_8888_ColorType, ColorSpace.MakeSRGB())
         assert surface is not None
-        yield surface
-        context.abandonContext()
+        return surface
+
+    @staticmethod
+    @contextlib.contextmanager
+    def skia_context():
+        context = GrDirectContext.MakeGL()
+        assert context is not None
+        try:
+            yield context
+        finally:
+            context.abandonContext()
 
     @staticmethod
     @contextlib.contextmanager
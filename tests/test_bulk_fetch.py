@@ -0,0 +1,141 @@
+import threading
+import time
+import pandas as pd
+import pytest
+from main.data import bulk_fetch
+from main.data.bulk_fetch import RateLimiter, fetch_many
+
+TIMES = [86400 * day for day in range(3)]
+
+
+def _seconds_column(asset, start, end):
+    return pd.DataFrame({'t': TIMES, 'price': [1.0, 2.0, 3.0]})
+
+
+def _datetime_index(asset, start, end):
+    # Out of order and missing a day, so joining by position would be wrong
+    index = pd.to_datetime([TIMES[2], TIMES[0]], unit='s').tz_localize('UTC')
+    return pd.DataFrame({'volume': [30.0, 10.0]}, index=index)
+
+
+def _seconds_index(asset, start, end):
+    return pd.DataFrame({'cap': [200.0]}, index=pd.Index([TIMES[1]]))
+
+
+def test_mixed_index_kinds_join_on_time():
+    frame = fetch_many([('BTC', 'price', 0, 0), ('BTC', 'volume', 0, 0),
+                        ('BTC', 'cap', 0, 0)],
+                       {'price': _seconds_column, 'volume': _datetime_index,
+                        'cap': _seconds_index})
+
+    assert list(frame.index) == list(pd.to_datetime(TIMES, unit='s'))
+    assert frame.index.name == 't'
+    assert list(frame['BTC.price']) == [1.0, 2.0, 3.0]
+    assert frame['BTC.volume'].tolist()[::2] == [10.0, 30.0]
+    assert pd.isna(frame['BTC.volume'].iloc[1])
+    assert frame['BTC.cap'].iloc[1] == 200.0
+
+
+def test_range_index_is_rejected_without_retrying():
+    calls = []
+
+    def getter(asset, start, end):
+        calls.append(asset)
+        return pd.DataFrame({'price': [1.0, 2.0]})
+
+    with pytest.raises(ValueError):
+        fetch_many([('BTC', 'price', 0, 0)], {'price': getter}, backoff=0.0)
+    assert calls == ['BTC']
+
+
+def test_unknown_metric_is_not_retried():
+    with pytest.raises(KeyError):
+        fetch_many([('BTC', 'price', 0, 0)], {}, backoff=0.0)
+
+
+def test_retries_until_exhausted():
+    calls = []
+
+    def getter(asset, start, end):
+        calls.append(asset)
+        raise ConnectionError('down')
+
+    with pytest.raises(ConnectionError):
+        fetch_many([('BTC', 'price', 0, 0)], {'price': getter},
+                   retries=2, backoff=0.0)
+    assert len(calls) == 3
+
+
+def test_retry_recovers():
+    calls = []
+
+    def getter(asset, start, end):
+        calls.append(asset)
+        if len(calls) < 3:
+            raise ConnectionError('down')
+        return _seconds_column(asset, start, end)
+
+    frame = fetch_many([('BTC', 'price', 0, 0)], {'price': getter},
+                       retries=2, backoff=0.0)
+    assert list(frame['BTC.price']) == [1.0, 2.0, 3.0]
+
+
+class _RateLimited(Exception):
+    def __init__(self, retry_after):
+        super().__init__('429')
+        self.response = type('Response', (), {
+            'status_code': 429, 'headers': {'Retry-After': retry_after}})()
+
+
+def test_rate_limit_backs_off_the_host(monkeypatch):
+    backed_off = []
+    monkeypatch.setattr(RateLimiter, 'back_off',
+                        lambda self, seconds: backed_off.append(seconds))
+    calls = []
+
+    def getter(asset, start, end):
+        calls.append(asset)
+        if len(calls) == 1:
+            raise _RateLimited('2.5')
+        return _seconds_column(asset, start, end)
+
+    fetch_many([('BTC', 'price', 0, 0)], {'price': getter}, backoff=0.0)
+    assert backed_off == [2.5]
+    assert len(calls) == 2
+
+
+def test_per_host_concurrency_is_limited():
+    lock = threading.Lock()
+    running = [0]
+    most = [0]
+
+    def getter(asset, start, end):
+        with lock:
+            running[0] += 1
+            most[0] = max(most[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return _seconds_column(asset, start, end)
+
+    fetch_many([(f'A{i}', 'price', 0, 0) for i in range(12)],
+               {'price': getter}, max_workers=12, per_host=3)
+    assert most[0] <= 3
+
+
+def test_back_off_pauses_entry(monkeypatch):
+    now = [100.0]
+    slept = []
+    monkeypatch.setattr(bulk_fetch.time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(bulk_fetch.time, 'sleep', slept.append)
+
+    limiter = RateLimiter(2)
+    limiter.back_off(3.0)
+    limiter.back_off(1.0)
+    with limiter:
+        pass
+    now[0] = 104.0
+    with limiter:
+        pass
+
+    assert slept == [3.0]
@@ -0,0 +1,71 @@
+import os
+import numpy as np
+import pytest
+from main.data.columnar_store import ColumnarStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ColumnarStore(str(tmp_path))
+
+
+def test_append_and_read(store):
+    assert store.append('BTC', 'price', 60, [3, 1, 2], {'close': [30.0, 10.0, 20.0]}) == 3
+
+    times, columns = store.read('BTC', 'price', 60)
+    assert times.tolist() == [1, 2, 3]
+    assert columns['close'].tolist() == [10.0, 20.0, 30.0]
+
+
+def test_append_skips_stored_and_duplicate_times(store):
+    store.append('BTC', 'price', 60, [1, 2, 3], {'close': [1.0, 2.0, 3.0]})
+
+    assert store.append('BTC', 'price', 60, [2, 3], {'close': [0.0, 0.0]}) == 0
+    assert store.append('BTC', 'price', 60, [3, 4, 4, 5],
+                        {'close': [0.0, 4.0, 0.0, 5.0]}) == 2
+
+    times, columns = store.read('BTC', 'price', 60)
+    assert times.tolist() == [1, 2, 3, 4, 5]
+    assert columns['close'].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_range_read(store):
+    store.append('BTC', 'price', 60, [10, 20, 30, 40], {'close': [1.0, 2.0, 3.0, 4.0]})
+
+    times, columns = store.read('BTC', 'price', 60, 15, 30)
+    assert times.tolist() == [20, 30]
+    assert columns['close'].tolist() == [2.0, 3.0]
+
+    times, columns = store.read('BTC', 'price', 60, 50, 60)
+    assert times.tolist() == []
+
+    times, columns = store.read('ETH', 'price', 60)
+    assert times.tolist() == [] and columns == {}
+
+
+def test_mismatched_columns_raise(store):
+    store.append('BTC', 'price', 60, [1], {'close': [1.0]})
+
+    with pytest.raises(ValueError):
+        store.append('BTC', 'price', 60, [2], {'open': [1.0]})
+
+
+def test_interrupted_append_is_discarded(store):
+    store.append('BTC', 'price', 60, [1, 2, 3], {'close': [10.0, 20.0, 30.0]})
+
+    # Rows written to the files but never committed to meta.json
+    directory = os.path.join(store.root, 'BTC', 'price-60')
+    with open(os.path.join(directory, 'times'), 'ab') as f:
+        f.write(np.array([4, 5], dtype='<i8').tobytes())
+    with open(os.path.join(directory, 'col_0'), 'ab') as f:
+        f.write(np.array([40.0, 50.0], dtype='<f8').tobytes())
+
+    assert store.read('BTC', 'price', 60)[0].tolist() == [1, 2, 3]
+
+    store.append('BTC', 'price', 60, [6], {'close': [60.0]})
+
+    reopened = ColumnarStore(store.root)
+    for s in (store, reopened):
+        times, columns = s.read('BTC', 'price', 60)
+        assert times.tolist() == [1, 2, 3, 6]
+        assert columns['close'].tolist() == [10.0, 20.0, 30.0, 60.0]
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+skia = pytest.importorskip('skia')
+pytest.importorskip('shared_crypto_analysis')
+
+from main import context_wrapper  # noqa: E402
+from main.context_wrapper import _make_skia_path  # noqa: E402
+
+
+def _reference(points, verbs):
+    path = skia.Path()
+    points = iter(points.tolist())
+    for verb in verbs.tolist():
+        if verb == 0:
+            path.moveTo(*next(points))
+        elif verb == 1:
+            path.lineTo(*next(points))
+        elif verb == 4:
+            path.cubicTo(*next(points), *next(points), *next(points))
+        else:
+            path.close()
+    return path
+
+
+@pytest.fixture
+def buffers():
+    rng = np.random.default_rng(0)
+    # Two contours: a closed one with a cubic, an open polyline
+    verbs = np.array([0, 1, 4, 1, 5, 0] + [1] * 9, dtype=np.uint8)
+    points = rng.uniform(-100, 100, (1 + 1 + 3 + 1 + 1 + 9, 2)).astype(np.float32)
+    return points, verbs
+
+
+def test_make_skia_path_matches_incremental_build(buffers):
+    points, verbs = buffers
+    path = _make_skia_path(points, verbs)
+
+    assert path == _reference(points, verbs)
+    assert path.getFillType() == skia.PathFillType.kWinding
+
+
+def test_serialized_paths_match_skias_own(buffers):
+    points, verbs = buffers
+
+    assert bytes(_reference(points, verbs).serialize()) == \
+        context_wrapper._serialize_path(points, verbs)
+
+
+def test_probe_rejects_a_different_format(monkeypatch):
+    monkeypatch.setattr(context_wrapper, '_PATH_SERIAL_VERSION', 99)
+
+    assert not context_wrapper._serialization_matches()
+
+
+@pytest.mark.parametrize('serialized', [True, False])
+def test_make_skia_path_without_serialization(buffers, monkeypatch, serialized):
+    points, verbs = buffers
+    monkeypatch.setattr(context_wrapper, '_SERIALIZED_PATHS', serialized)
+
+    assert _make_skia_path(points, verbs) == _reference(points, verbs)
+
+
+def test_make_skia_path_falls_back_when_serialization_is_rejected(buffers, monkeypatch):
+    points, verbs = buffers
+    monkeypatch.setattr(context_wrapper, '_PATH_SERIAL_VERSION', 99)
+
+    assert _make_skia_path(points, verbs) == _reference(points, verbs)
+
+
+def test_make_skia_path_empty():
+    path = _make_skia_path(np.empty((0, 2), np.float32), np.empty(0, np.uint8))
+    assert path.isEmpty()
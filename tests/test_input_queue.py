@@ -0,0 +1,133 @@
+import pytest
+
+pytest.importorskip('shared_crypto_analysis')
+
+from shared_crypto_analysis.shared_python.shared_math.geometry import Vec2  # noqa: E402
+from main.helpers import MOUSE_ACTION, Color  # noqa: E402
+from main.input_queue import InputQueue  # noqa: E402
+
+
+def _flush(queue: InputQueue) -> list:
+    log = []
+    queue.flush(lambda action, pos: log.append((action, pos.x, pos.y)),
+                lambda xoffset, yoffset: log.append(('scroll', xoffset, yoffset)))
+    return log
+
+
+def test_consecutive_drags_keep_latest_position():
+    queue = InputQueue()
+    for i in range(10):
+        queue.push_action(MOUSE_ACTION.LEFT_CLICK_DRAG, i, i * 2)
+
+    assert len(queue) == 1
+    assert _flush(queue) == [(MOUSE_ACTION.LEFT_CLICK_DRAG, 9, 18)]
+    assert len(queue) == 0
+
+
+def test_drags_are_not_merged_across_other_events():
+    queue = InputQueue()
+    queue.push_action(MOUSE_ACTION.LEFT_CLICK_DOWN, 0, 0)
+    queue.push_action(MOUSE_ACTION.LEFT_CLICK_DRAG, 1, 1)
+    queue.push_action(MOUSE_ACTION.LEFT_CLICK_DRAG, 2, 2)
+    queue.push_scroll(0, 1)
+    queue.push_action(MOUSE_ACTION.LEFT_CLICK_DRAG, 3, 3)
+    queue.push_action(MOUSE_ACTION.LEFT_CLICK_UP, 3, 3)
+    queue.push_action(MOUSE_ACTION.LEFT_CLICK_DRAG, 4, 4)
+
+    assert _flush(queue) == [
+        (MOUSE_ACTION.LEFT_CLICK_DOWN, 0, 0),
+        (MOUSE_ACTION.LEFT_CLICK_DRAG, 2, 2),
+        ('scroll', 0, 1),
+        (MOUSE_ACTION.LEFT_CLICK_DRAG, 3, 3),
+        (MOUSE_ACTION.LEFT_CLICK_UP, 3, 3),
+        (MOUSE_ACTION.LEFT_CLICK_DRAG, 4, 4),
+    ]
+
+
+def test_scroll_steps_share_an_entry_and_apply_in_order():
+    queue = InputQueue()
+    queue.push_scroll(0, -2)
+    queue.push_scroll(0, 1)
+
+    assert len(queue) == 1
+    assert _flush(queue) == [('scroll', 0, -2), ('scroll', 0, 1)]
+
+
+def test_merged_scroll_clamps_like_single_steps():
+    skia = pytest.importorskip('skia')  # noqa: F841
+    from main.session.scene.scene import Transform
+
+    stepped, queued = Transform(), Transform()
+    stepped.scale_factor = queued.scale_factor = 0.4
+
+    stepped.mouse_scroll(0, -2)
+    stepped.mouse_scroll(0, 1)
+
+    queue = InputQueue()
+    queue.push_scroll(0, -2)
+    queue.push_scroll(0, 1)
+    queue.flush(lambda action, pos: None, queued.mouse_scroll)
+
+    assert queued.scale_factor == pytest.approx(stepped.scale_factor)
+
+
+def test_dragged_shape_follows_merged_drags():
+    pytest.importorskip('skia')
+    from main.session.scene.scene import Scene
+    from main.session.scene.shapes.shapes import Shape
+
+    scene = Scene()
+    scene.transform.width = 400
+    scene.transform.height = 300
+    shape = Shape.construct_polygon(Vec2(0.0, 0.0), 40, 6, Color(50, 50, 50))
+    scene.add_shape(shape)
+    left = shape.bounds()[0]
+
+    # The hexagon's centre is at the middle of the screen
+    queue = InputQueue()
+    queue.push_action(MOUSE_ACTION.LEFT_CLICK_DOWN, 200, 150)
+    for x in range(201, 231):
+        queue.push_action(MOUSE_ACTION.LEFT_CLICK_DRAG, x, 150)
+    queue.flush(scene.mouse_action, scene.mouse_scroll)
+
+    for x in range(231, 241):
+        queue.push_action(MOUSE_ACTION.LEFT_CLICK_DRAG, x, 150)
+    queue.flush(scene.mouse_action, scene.mouse_scroll)
+
+    assert shape.bounds()[0] - left == pytest.approx(40.0)
+
+
+def test_drag_within_one_batch_leaves_no_ghost():
+    pytest.importorskip('skia')
+    from main.headless import HeadlessRenderer
+    from main.session.session import Session
+    from main.session.scene.shapes.shapes import Shape
+
+    session = Session()
+    scene = session.scene
+    scene.transform.width = 400
+    scene.transform.height = 300
+    scene.tiles.frame_budget = None
+    renderer = HeadlessRenderer(400, 300)
+
+    def pixel(x, y):
+        return renderer.snapshot().toarray()[y, x].tolist()
+
+    renderer.render(session)
+    background = pixel(210, 160), pixel(330, 160)
+
+    scene.add_shape(Shape.construct_polygon(
+        Vec2(0.0, 0.0), 40, 6, Color(200, 200, 200)))
+    renderer.render(session)
+    assert pixel(210, 160) != background[0]
+
+    # Press, drag and release all land before the next frame
+    queue = InputQueue()
+    queue.push_action(MOUSE_ACTION.LEFT_CLICK_DOWN, 200, 150)
+    queue.push_action(MOUSE_ACTION.LEFT_CLICK_DRAG, 320, 150)
+    queue.push_action(MOUSE_ACTION.LEFT_CLICK_UP, 320, 150)
+    queue.flush(scene.mouse_action, scene.mouse_scroll)
+
+    renderer.render(session)
+    assert pixel(210, 160) == background[0]
+    assert pixel(330, 160) != background[1]
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from main.session.scene.series.lod import MinMaxPyramid
+
+
+@pytest.mark.parametrize('length', [1, 2, 7, 64, 1000])
+def test_levels_keep_each_bins_min_and_max(length):
+    rng = np.random.default_rng(length)
+    xs = np.cumsum(rng.uniform(0.5, 1.5, length))
+    ys = np.cumsum(rng.normal(size=length))
+    pyramid = MinMaxPyramid(xs, ys)
+
+    assert pyramid.num_levels == 1 + int(np.ceil(np.log2(length)))
+    for level, (starts, min_xs, min_ys, max_xs, max_ys) in enumerate(pyramid._levels):
+        width = 2 ** level
+        assert len(starts) == -(-length // width)
+
+        for i in range(len(starts)):
+            raw = slice(i * width, (i + 1) * width)
+            assert starts[i] == xs[raw][0]
+            assert min_ys[i] == ys[raw].min()
+            assert max_ys[i] == ys[raw].max()
+            # The x of a sample holding that value, so it stays in time order
+            assert min_xs[i] in xs[raw][ys[raw] == min_ys[i]]
+            assert max_xs[i] in xs[raw][ys[raw] == max_ys[i]]
+
+
+def test_query_emits_min_and_max_in_time_order():
+    xs = np.arange(1024, dtype=np.float64)
+    ys = np.sin(xs / 10.0)
+    pyramid = MinMaxPyramid(xs, ys)
+
+    level, first, last, qxs, qys = pyramid.query(100.0, 900.0, 100)
+    assert level == 3
+    assert np.all(np.diff(qxs) >= 0)
+    assert qxs[0] <= 100.0 and qxs[-1] >= 900.0 - 8
+
+    # Every raw sample in the range lies within the emitted envelope
+    for i in range(first, last):
+        raw = ys[i * 8:(i + 1) * 8]
+        assert qys[2 * (i - first):2 * (i - first) + 2].min() == raw.min()
+        assert qys[2 * (i - first):2 * (i - first) + 2].max() == raw.max()
+
+
+def test_level_zero_when_there_is_room():
+    xs = np.arange(100, dtype=np.float64)
+    pyramid = MinMaxPyramid(xs, xs)
+
+    level, first, last, qxs, qys = pyramid.query(10.0, 20.0, 500)
+    assert level == 0
+    np.testing.assert_array_equal(qxs, xs[first:last])
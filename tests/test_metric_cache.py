@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+from main.data import metric_cache
+from main.data.metric_cache import MetricCache
+
+DAY = 86400
+LISTED = 10 * DAY
+
+
+class StubGetter:
+    """
+    Stands in for a crypto_requests getter: daily closes indexed by time,
+    nothing before the asset listed, and the open bar's value changing
+    between calls
+    """
+
+    def __init__(self) -> None:
+        self.calls = []
+        self.open_value = 0.0
+
+    def __call__(self, asset: str, start: int, end: int) -> pd.DataFrame:
+        self.calls.append((asset, start, end))
+
+        first = max(start, LISTED)
+        times = np.arange(-(-first // DAY) * DAY, end + 1, DAY)
+        if not len(times):
+            # Like an API returning no rows, with a default index
+            return pd.DataFrame()
+
+        values = times / DAY
+        values[times == clock.now // DAY * DAY] = self.open_value
+        return pd.DataFrame({'close': values},
+                            index=pd.DatetimeIndex(pd.to_datetime(times, unit='s'), name='t'))
+
+
+class _Clock:
+    now = 100 * DAY + 3600
+
+
+clock = _Clock()
+
+
+@pytest.fixture
+def getter(monkeypatch):
+    clock.now = 100 * DAY + 3600
+    monkeypatch.setattr(metric_cache.time, 'time', lambda: clock.now)
+    return StubGetter()
+
+
+def test_gaps_are_fetched_once(tmp_path, getter):
+    cache = MetricCache(str(tmp_path))
+    get = cache.wrap(getter, 'close')
+
+    first = get('BTC', 20 * DAY, 30 * DAY)
+    assert len(first) == 11
+    assert getter.calls == [('BTC', 20 * DAY, 30 * DAY)]
+
+    wider = get('BTC', 15 * DAY, 40 * DAY)
+    assert getter.calls[1:] == [('BTC', 15 * DAY, 20 * DAY - 1),
+                                ('BTC', 30 * DAY + 1, 40 * DAY)]
+    assert wider['close'].tolist() == list(range(15, 41))
+
+    get('BTC', 16 * DAY, 39 * DAY)
+    assert len(getter.calls) == 3
+
+
+def test_reload_from_disk(tmp_path, getter):
+    expected = MetricCache(str(tmp_path)).get(getter, 'BTC', 'close', 20 * DAY, 30 * DAY)
+
+    reloaded = MetricCache(str(tmp_path)).get(getter, 'BTC', 'close', 20 * DAY, 30 * DAY)
+    assert len(getter.calls) == 1
+    pd.testing.assert_frame_equal(reloaded, expected)
+    assert isinstance(reloaded.index, pd.DatetimeIndex)
+
+
+def test_open_bar_is_refetched_after_ttl(tmp_path, getter):
+    cache = MetricCache(str(tmp_path), ttl=300)
+    end = clock.now
+
+    getter.open_value = 1.0
+    assert cache.get(getter, 'BTC', 'close', 90 * DAY, end)['close'].iloc[-1] == 1.0
+
+    getter.open_value = 2.0
+    clock.now += 100
+    assert cache.get(getter, 'BTC', 'close', 90 * DAY, end)['close'].iloc[-1] == 1.0
+    assert len(getter.calls) == 1
+
+    clock.now += 300
+    frame = cache.get(getter, 'BTC', 'close', 90 * DAY, end)
+    assert frame['close'].iloc[-1] == 2.0
+    assert getter.calls[-1] == ('BTC', 100 * DAY, end)
+    assert len(frame) == 11
+
+
+def test_empty_first_fetch_keeps_datetime_index(tmp_path, getter):
+    cache = MetricCache(str(tmp_path))
+
+    assert cache.get(getter, 'BTC', 'close', 0, 5 * DAY).empty
+
+    frame = cache.get(getter, 'BTC', 'close', 0, 12 * DAY)
+    assert isinstance(frame.index, pd.DatetimeIndex)
+    assert frame['close'].tolist() == [10.0, 11.0, 12.0]
+
+    reloaded = MetricCache(str(tmp_path)).get(getter, 'BTC', 'close', 0, 12 * DAY)
+    assert isinstance(reloaded.index, pd.DatetimeIndex)
+
+
+def test_start_after_end_raises(tmp_path, getter):
+    with pytest.raises(ValueError):
+        MetricCache(str(tmp_path)).get(getter, 'BTC', 'close', 5 * DAY, DAY)
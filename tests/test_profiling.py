@@ -0,0 +1,54 @@
+import json
+import threading
+from main.profiling import Profiler
+
+
+def test_spans_are_counted_per_frame():
+    profiler = Profiler()
+    profiler.enabled = True
+
+    profiler.begin_frame()
+    for _ in range(3):
+        with profiler.span('draw'):
+            pass
+    profiler.end_frame()
+
+    frame, = profiler.frames
+    assert frame.spans['draw'][0] == 3
+    assert frame.spans['frame'][0] == 1
+    assert frame.duration_ns > 0
+
+
+def test_other_threads_only_reach_the_trace(tmp_path):
+    profiler = Profiler()
+    profiler.enabled = True
+
+    def work():
+        with profiler.span('worker'):
+            pass
+
+    profiler.begin_frame()
+    thread = threading.Thread(target=work)
+    thread.start()
+    thread.join()
+    profiler.end_frame()
+
+    frame, = profiler.frames
+    assert 'worker' not in frame.spans
+
+    path = tmp_path / 'trace.json'
+    profiler.export_trace(str(path))
+    events = json.loads(path.read_text())['traceEvents']
+    worker, = [event for event in events if event['name'] == 'worker']
+    assert worker['tid'] == thread.ident
+
+
+def test_disabled_records_nothing():
+    profiler = Profiler()
+
+    profiler.begin_frame()
+    with profiler.span('draw'):
+        pass
+    profiler.end_frame()
+
+    assert profiler.frames == []
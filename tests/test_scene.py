@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip('skia')
+pytest.importorskip('shared_crypto_analysis')
+
+from shared_crypto_analysis.shared_python.shared_math.geometry import Vec2  # noqa: E402
+from main.helpers import Color  # noqa: E402
+from main.session.scene.scene import Scene  # noqa: E402
+from main.session.scene.shapes.shapes import Shape  # noqa: E402
+
+
+def test_scene_follows_shape_changes_through_one_listener():
+    scene = Scene()
+    shapes = [Shape.construct_polygon(Vec2(0.0, 0.0), 10, 6, Color(50, 50, 50)),
+              Shape.construct_circle(Vec2(100.0, 0.0), 10, Color(50, 50, 50))]
+    for shape in shapes:
+        scene.add_shape(shape)
+
+    assert shapes[0].listener is shapes[1].listener
+    assert not hasattr(shapes[0], '__dict__')
+
+    shapes[0].translate(Vec2(0.0, 500.0))
+    assert list(scene._index.query_point(0.0, 500.0)) == [shapes[0]]
+    assert list(scene._index.query_point(0.0, 0.0)) == []
+
+    scene.remove_shape(shapes[0])
+    assert shapes[0].listener is None
+    shapes[0].translate(Vec2(0.0, 10.0))
+    assert shapes[0].id not in scene._index
@@ -0,0 +1,70 @@
+import random
+import pytest
+from main.session.scene.spatial_index import SpatialGrid
+
+
+def _overlaps(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _random_bounds(rng, spread=2000.0, largest=600.0):
+    left = rng.uniform(-spread, spread)
+    top = rng.uniform(-spread, spread)
+    return (left, top, left + rng.uniform(0, largest), top + rng.uniform(0, largest))
+
+
+@pytest.fixture
+def scene():
+    rng = random.Random(0)
+    grid = SpatialGrid(cell_size=128.0)
+    items = {}
+    for key in range(300):
+        items[key] = _random_bounds(rng)
+        grid.insert(key, key, items[key])
+
+    # Move some a little, some across cells, and drop a few
+    for key in range(0, 300, 3):
+        left, top, right, bottom = items[key]
+        dx, dy = rng.choice([(1.0, 0.5), (300.0, -700.0)])
+        items[key] = (left + dx, top + dy, right + dx, bottom + dy)
+        grid.update(key, items[key])
+    for key in range(0, 300, 7):
+        grid.remove(key)
+        del items[key]
+
+    return rng, grid, items
+
+
+def test_query_rect_matches_brute_force(scene):
+    rng, grid, items = scene
+
+    for _ in range(200):
+        # Small and huge queries take different paths
+        query = _random_bounds(rng, largest=rng.choice([100.0, 50000.0]))
+        expected = [key for key, bounds in items.items() if _overlaps(bounds, query)]
+        assert grid.query_rect(query) == expected
+
+
+def test_query_point_matches_brute_force(scene):
+    rng, grid, items = scene
+
+    for _ in range(500):
+        x, y = rng.uniform(-2500, 2500), rng.uniform(-2500, 2500)
+        expected = [key for key, bounds in items.items()
+                    if bounds[0] <= x <= bounds[2] and bounds[1] <= y <= bounds[3]]
+        assert grid.query_point(x, y) == expected
+
+
+def test_update_within_cells_leaves_cells_alone():
+    grid = SpatialGrid(cell_size=100.0)
+    grid.insert('a', 'a', (10.0, 10.0, 20.0, 20.0))
+    cells = grid._cells[(0, 0)]
+
+    grid.update('a', (30.0, 30.0, 40.0, 40.0))
+    assert grid._cells == {(0, 0): cells}
+    assert grid.bounds('a') == (30.0, 30.0, 40.0, 40.0)
+    assert grid.query_point(35.0, 35.0) == ['a']
+    assert grid.query_point(15.0, 15.0) == []
+
+    grid.update('a', (150.0, 30.0, 160.0, 40.0))
+    assert set(grid._cells) == {(1, 0)}
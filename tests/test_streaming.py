@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+from main.data.streaming import StreamingATR, StreamingEMA, _SeedBar
+from main.data.tpi_batch import sma
+
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(0)
+    closes = 100 + np.cumsum(rng.normal(size=300))
+    highs = closes + rng.uniform(0, 2, 300)
+    lows = closes - rng.uniform(0, 2, 300)
+    return highs, lows, closes
+
+
+def _batch_ema(values, period, alpha):
+    """
+    SMA of the first period values, then pandas' recursive EMA
+    """
+    seeded = pd.Series(np.concatenate([[values[:period].mean()], values[period:]]))
+    ret = np.full(len(values), np.nan)
+    ret[period - 1:] = seeded.ewm(alpha=alpha, adjust=False).mean()
+    return ret
+
+
+def _batch_atr(highs, lows, closes, period):
+    prev = pd.Series(closes).shift(1)
+    true_range = (pd.concat([pd.Series(highs), prev], axis=1).max(axis=1) -
+                  pd.concat([pd.Series(lows), prev], axis=1).min(axis=1))
+    return _batch_ema(true_range.to_numpy(), period, 1.0 / period)
+
+
+@pytest.mark.parametrize('period', [1, 5, 20])
+def test_ema_matches_batch(bars, period):
+    _, _, closes = bars
+    ema = StreamingEMA(period)
+    streamed = [ema.update(value) for value in closes.tolist()]
+
+    np.testing.assert_allclose(streamed, _batch_ema(closes, period, 2.0 / (period + 1)),
+                               equal_nan=True)
+
+
+def test_ema_seed_is_the_sma(bars):
+    _, _, closes = bars
+    ema = StreamingEMA(20)
+    ema.seed(closes[:20])
+
+    assert ema.ready
+    assert ema.value == pytest.approx(sma(closes, 20)[19])
+
+
+@pytest.mark.parametrize('period', [1, 14])
+def test_atr_matches_batch(bars, period):
+    highs, lows, closes = bars
+    atr = StreamingATR(period)
+    streamed = [atr.update(_SeedBar(*bar))
+                for bar in zip(highs.tolist(), lows.tolist(), closes.tolist())]
+
+    np.testing.assert_allclose(streamed, _batch_atr(highs, lows, closes, period),
+                               equal_nan=True)
+
+
+def test_open_bar_updates_do_not_commit(bars):
+    highs, lows, closes = bars
+    atr = StreamingATR(14)
+    atr.seed(highs[:-1], lows[:-1], closes[:-1])
+
+    # The last bar arrives as a series of open updates, then closes
+    for fraction in (0.2, 0.9, 0.5):
+        atr.update(_SeedBar(closes[-2] + fraction, closes[-2] - fraction, closes[-2]),
+                   closed=False)
+    atr.update(_SeedBar(highs[-1], lows[-1], closes[-1]))
+
+    assert atr.value == pytest.approx(_batch_atr(highs, lows, closes, 14)[-1])
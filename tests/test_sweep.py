@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from main.data.sweep import atr, sweep
+
+
+def _score(data, period, atr_factor):
+    band = atr(data, period) * atr_factor
+    moves = data['high'] - data['close']
+    return {'hits': int((moves > band).sum()),
+            'mean band': float(np.nanmean(band))}
+
+
+@pytest.fixture
+def arrays():
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(size=2000))
+    return {'high': close + rng.uniform(0, 3, 2000),
+            'low': close - rng.uniform(0, 3, 2000),
+            'close': close}
+
+
+GRID = {'period': [5, 14, 30], 'atr_factor': [0.5, 1.0, 2.0]}
+
+
+def test_process_pool_matches_serial(arrays):
+    serial = sweep(_score, GRID, arrays, workers=1)
+    pooled = sweep(_score, GRID, arrays, workers=2, chunksize=2)
+
+    assert len(serial) == 9
+    assert list(serial.columns) == ['period', 'atr_factor', 'hits', 'mean band']
+    pd.testing.assert_frame_equal(serial, pooled)
+
+
+def test_atr_matches_wilder_smoothing(arrays):
+    serial = sweep(_score, {'period': [14], 'atr_factor': [1.0]}, arrays, workers=1)
+
+    high, low, close = arrays['high'], arrays['low'], arrays['close']
+    prev = np.concatenate(([close[0]], close[:-1]))
+    ranges = np.maximum(high, prev) - np.minimum(low, prev)
+    expected = [ranges[:14].mean()]
+    for value in ranges[14:]:
+        expected.append(expected[-1] + (value - expected[-1]) / 14)
+
+    assert serial['mean band'][0] == pytest.approx(np.mean(expected))
@@ -0,0 +1,196 @@
+import pytest
+
+pytest.importorskip('skia')
+pytest.importorskip('shared_crypto_analysis')
+
+from main.session.scene import tiles  # noqa: E402
+from main.session.scene.tiles import TileCache  # noqa: E402
+
+
+class _Clock:
+    """
+    Stands in for the time module; only moves when a tile is drawn
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(tiles, 'time', clock)
+    return clock
+
+
+class _Image:
+    def __init__(self, pixels):
+        self.pixels = pixels
+
+    def width(self):
+        return self.pixels
+
+    def height(self):
+        return self.pixels
+
+
+class _Context:
+    """
+    Stands in for a ContextWrapper, recording what the cache rasterizes
+    and draws
+    """
+
+    def __init__(self):
+        self.rasterized = []
+        self.drawn = []
+
+    def concat(self, matrix):
+        pass
+
+    def rasterize(self, width, height, draw):
+        draw(self)
+        self.rasterized.append(width)
+        return _Image(width)
+
+    def draw_image(self, image, src, dst):
+        self.drawn.append((image.pixels, dst))
+
+
+def _cache(clock=None, cost=0.0, empty=(), **kwargs):
+    bounds = []
+
+    def content(tile_bounds):
+        bounds.append(tile_bounds)
+        if tile_bounds in empty:
+            return None
+
+        def draw(context):
+            if clock is not None:
+                clock.now += cost
+
+        return draw
+
+    return TileCache(content, **kwargs), bounds
+
+
+# Four tiles at scale 1
+VISIBLE = (0.0, 0.0, 511.0, 511.0)
+
+
+def test_unbudgeted_draw_renders_every_tile():
+    cache, _ = _cache(frame_budget=None)
+    context = _Context()
+
+    cache.draw(context, VISIBLE, 1.0)
+
+    assert context.rasterized == [TileCache.TILE_SIZE] * 4
+    assert [pixels for pixels, _ in context.drawn] == [TileCache.TILE_SIZE] * 4
+    assert cache.is_current(VISIBLE, 1.0)
+
+
+def test_budget_spreads_tiles_over_frames(clock):
+    cache, _ = _cache(clock, cost=0.01, frame_budget=0.0)
+    context = _Context()
+    remaining = []
+    cache.tile_ready.register(remaining.append)
+
+    cache.draw(context, VISIBLE, 1.0)
+    # One render per frame at least, a preview first
+    assert context.rasterized == [TileCache.PREVIEW_SIZE]
+    assert remaining == [7]
+
+    frames = 1
+    while not cache.is_current(VISIBLE, 1.0):
+        cache.draw(context, VISIBLE, 1.0)
+        frames += 1
+
+    assert frames == 8
+    assert context.rasterized == [TileCache.PREVIEW_SIZE] * 4 + \
+        [TileCache.TILE_SIZE] * 4
+    assert remaining == [7, 6, 5, 4, 3, 2, 1]
+
+
+@pytest.mark.parametrize('budget, per_frame', [
+    (0.004, [1, 1, 1, 1, 1, 1, 1, 1]),
+    (0.005, [1, 1, 1, 1, 1, 1, 1, 1]),
+    (0.012, [3, 3, 2]),
+    (1.0, [8]),
+])
+def test_budget_bounds_tiles_per_frame(clock, budget, per_frame):
+    # Every preview and tile takes 5ms
+    cache, _ = _cache(clock, cost=0.005, frame_budget=budget)
+    context = _Context()
+
+    rendered = []
+    while not cache.is_current(VISIBLE, 1.0):
+        before = len(context.rasterized)
+        cache.draw(context, VISIBLE, 1.0)
+        rendered.append(len(context.rasterized) - before)
+
+    # Stops at the first render finishing past the budget
+    assert rendered == per_frame
+
+
+def test_empty_tiles_are_not_rasterized():
+    empty = [TileCache.tile_bounds((0, 1, 0)), TileCache.tile_bounds((0, 1, 1))]
+    cache, _ = _cache(empty=empty, frame_budget=0.0)
+    context = _Context()
+
+    while not cache.is_current(VISIBLE, 1.0):
+        cache.draw(context, VISIBLE, 1.0)
+
+    assert context.rasterized == [TileCache.PREVIEW_SIZE] * 2 + \
+        [TileCache.TILE_SIZE] * 2
+    context.drawn.clear()
+    cache.draw(context, VISIBLE, 1.0)
+    assert [dst for _, dst in context.drawn] == \
+        [TileCache.tile_bounds((0, 0, 0)), TileCache.tile_bounds((0, 0, 1))]
+
+
+def test_invalidate_only_marks_overlapping_tiles():
+    cache, bounds = _cache(frame_budget=None)
+    context = _Context()
+    cache.draw(context, VISIBLE, 1.0)
+    cache.draw(context, VISIBLE, 2.0)
+    bounds.clear()
+
+    cache.invalidate((10.0, 10.0, 20.0, 20.0))
+
+    assert not cache.is_current((10.0, 10.0, 20.0, 20.0), 1.0)
+    assert not cache.is_current((10.0, 10.0, 20.0, 20.0), 2.0)
+    assert cache.is_current((300.0, 300.0, 310.0, 310.0), 1.0)
+
+    cache.draw(context, VISIBLE, 1.0)
+    assert bounds == [TileCache.tile_bounds((0, 0, 0))]
+
+    # Bounds far larger than what is cached
+    cache.invalidate((-1e9, -1e9, 1e9, 1e9))
+    assert not cache.is_current((300.0, 300.0, 310.0, 310.0), 1.0)
+
+
+def test_stale_tile_keeps_drawing_until_replaced():
+    cache, _ = _cache(frame_budget=0.0)
+    context = _Context()
+    for _ in range(8):
+        cache.draw(context, VISIBLE, 1.0)
+
+    cache.invalidate()
+    context.drawn.clear()
+    cache.draw(context, VISIBLE, 1.0)
+
+    assert [pixels for pixels, _ in context.drawn] == [TileCache.TILE_SIZE] * 4
+
+
+def test_eviction_keeps_memory_in_budget():
+    tile_bytes = TileCache.TILE_SIZE ** 2 * 4
+    cache, _ = _cache(frame_budget=None, budget_bytes=2 * tile_bytes)
+    context = _Context()
+
+    cache.draw(context, VISIBLE, 1.0)
+
+    assert cache.memory_bytes == 2 * tile_bytes
+    # Evicted keys are dropped from the bucket index too
+    assert sum(len(keys) for keys in cache._buckets.values()) == 2
@@ -0,0 +1,62 @@
+from functools import partial
+import numpy as np
+import pandas as pd
+import pytest
+from main.data.tpi_batch import above_sma, ema, ema_cross, evaluate, roc_sign, sma
+
+COMPONENTS = {
+    'ema 3/8': partial(ema_cross, fast=3, slow=8),
+    'sma 5': partial(above_sma, period=5),
+    'roc 4': partial(roc_sign, period=4),
+}
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(0)
+    prices = 100 + np.cumsum(rng.normal(size=(60, 5)), axis=0)
+    # Listed late, and with gaps in the middle
+    prices[:10, 1] = np.nan
+    prices[[20, 21, 35], 2] = np.nan
+    return prices
+
+
+def test_ema_matches_pandas_per_symbol(prices):
+    batch = ema(prices, 8)
+
+    for asset in range(prices.shape[1]):
+        expected = pd.Series(prices[:, asset]).ewm(
+            span=8, adjust=False, ignore_na=True).mean()
+        np.testing.assert_allclose(batch[:, asset], expected, equal_nan=True)
+
+
+def test_ema_holds_across_gaps(prices):
+    batch = ema(prices, 8)
+
+    assert np.isnan(batch[:10, 1]).all()
+    assert batch[20, 2] == batch[19, 2] == batch[21, 2]
+    assert not np.isnan(batch[22:, 2]).any()
+
+
+def test_sma_matches_pandas_per_symbol(prices):
+    batch = sma(prices, 5)
+
+    for asset in range(prices.shape[1]):
+        expected = pd.Series(prices[:, asset]).rolling(5).mean()
+        np.testing.assert_allclose(batch[:, asset], expected, equal_nan=True)
+
+
+def test_batch_matches_each_symbol_alone(prices):
+    batch = evaluate(prices, COMPONENTS, workers=1)
+    assert batch.shape == (60, 5, 3)
+
+    for asset in range(prices.shape[1]):
+        alone = evaluate(prices[:, asset:asset + 1], COMPONENTS, workers=1)
+        np.testing.assert_array_equal(batch[:, asset:asset + 1], alone)
+
+
+def test_worker_processes_match_serial(prices):
+    serial = evaluate(prices, COMPONENTS, workers=1)
+    split = evaluate(prices, COMPONENTS, workers=2, min_assets_per_worker=2)
+
+    np.testing.assert_array_equal(serial, split)